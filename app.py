@@ -1,25 +1,125 @@
+import logging
+import time
+
+script_started = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from food_wastage_app import analytics, charts, registry
+from food_wastage_app.diagnostics import QueryTrace, read_log, summarize
+from food_wastage_app.events import from_environment
+from food_wastage_app.expiry import ExpiryIndex
+from food_wastage_app.facts import FACT_COLUMNS, data_version
+from food_wastage_app.filters import FilterPredicate
+from food_wastage_app.partitions import PartitionStore
+from food_wastage_app.results import ResultCache
+from food_wastage_app.rollups import ClaimRollups
+from food_wastage_app.snapshots import read_table
+from food_wastage_app.startup import StartupReport
+from food_wastage_app.store import DataStore
+from food_wastage_app.summaries import RefreshScheduler, SummaryStore
+
+imports_done = time.perf_counter()
 
 # =========================
 # Page Config
 # =========================
 st.set_page_config(page_title="FoodRescue Analytics Hub", layout="wide")
 
+# Timings of the first run in this process, appended to snapshots/startup_log.jsonl
+@st.cache_resource
+def load_startup_report():
+    return StartupReport()
+
+startup = load_startup_report()
+startup.record("imports", imports_done - script_started)
+
+# =========================
+# Header
+# =========================
+# Drawn before anything is loaded so the page shell paints immediately
+st.markdown(
+    """
+    <div style="padding:20px; border-radius:15px; background: linear-gradient(90deg, #6a11cb, #2575fc); text-align:center;">
+        <h1 style="color:white;">🍽️ FoodRescue Analytics Hub</h1>
+        <h3 style="color:white;">Advanced Food Wastage Management & Analytics Platform</h3>
+    </div>
+    """, unsafe_allow_html=True
+)
+
 # =========================
 # Load Data (Replace with your CSV paths)
 # =========================
 @st.cache_data
-def load_data():
-    providers = pd.read_csv("providers.csv")
-    receivers = pd.read_csv("receivers.csv")
-    listings = pd.read_csv("listings.csv")
-    claims = pd.read_csv("claims.csv")
-    return providers, receivers, listings, claims
-
-provider_df, receiver_df, listings_df, claims_df = load_data()
+def load_filter_options(version):
+    # Only the columns the sidebar needs are read
+    providers = read_table("providers.csv", columns=["City", "Type"])
+    listings = read_table("listings.csv", columns=["Food_Type", "Expiry_Date"])
+    claims = read_table("claims.csv", columns=["Timestamp"])
+    dates = pd.concat([listings["Expiry_Date"], claims["Timestamp"]]).dropna()
+    # Whole months around the data, so the default range hides nothing
+    first_day = dates.min().to_period("M").start_time.date()
+    last_day = dates.max().to_period("M").end_time.date()
+    return (
+        list(providers["City"].unique()), list(providers["Type"].unique()),
+        list(listings["Food_Type"].unique()), first_day, last_day,
+    )
+
+# Claims and listings split by month; rebuilt on first use after their CSV changes
+@st.cache_resource
+def load_partitions():
+    return PartitionStore()
+
+# One read-only copy of the tables and facts for the whole process: sessions
+# share the same frames instead of each unpickling its own, the store reloads
+# (atomically) when the CSVs change, and each table is read on first use
+# (date-filtered, from the month partitions in range until it is loaded whole)
+@st.cache_resource
+def load_store():
+    return DataStore(partitions=load_partitions())
+
+store = load_store()
+version = store.version()
+options_started = time.perf_counter()
+city_options, provider_type_options, food_type_options, first_day, last_day = load_filter_options(version)
+startup.record("filter options", time.perf_counter() - options_started)
+
+# Claim rollups are shared across sessions and only read rows appended to claims.csv
+@st.cache_resource
+def load_claim_rollups(receivers_version):
+    return ClaimRollups.from_csv("claims.csv", read_table("receivers.csv"))
+
+# KPI summary tables: a background scheduler keeps them current, and each use
+# catches up on anything it has not seen yet (a no-op when nothing changed)
+@st.cache_resource
+def load_summaries():
+    store = SummaryStore()
+    store.refresh()
+    RefreshScheduler(store).start()
+    return store
+
+# Unclaimed listings bucketed by the hour they expire, rebuilt when the data changes;
+# only the current version's index is kept
+@st.cache_resource(max_entries=1)
+def load_expiry_index(version):
+    data = store.dataset(None, registry.required_columns([registry.VIEWS[40]]))
+    return ExpiryIndex.from_listing_facts(data.listing_facts)
+
+# With FOODRESCUE_EVENTS_DB set, dashboard queries are recorded in that database's
+# analytics table by a background writer; recording only queues the event
+@st.cache_resource
+def load_event_writer():
+    return from_environment()
+
+events = load_event_writer()
+
+# Finished result tables, shared by every session and kept on disk across restarts
+@st.cache_resource
+def load_result_cache():
+    return ResultCache(max_entries=512, ttl=3600, path="snapshots/results.db")
+
+results = load_result_cache()
 
 # =========================
 # Sidebar Controls
@@ -28,507 +128,163 @@ with st.sidebar:
     st.header("⚙️ Control Panel")
     
     st.subheader("📍 Location Filters")
-    selected_cities = st.multiselect("Select Cities", provider_df["City"].unique())
+    selected_cities = st.multiselect("Select Cities", city_options)
     
     st.subheader("🎯 Data Filters")
-    start_date = st.date_input("Start Date", pd.to_datetime("2024-01-01"))
-    end_date = st.date_input("End Date", pd.to_datetime("2024-12-31"))
+    start_date = st.date_input("Start Date", first_day)
+    end_date = st.date_input("End Date", last_day)
     
-    provider_types = st.multiselect("Provider Types", provider_df["Type"].unique())
-    food_types = st.multiselect("Food Types", listings_df["Food_Type"].unique())
+    provider_types = st.multiselect("Provider Types", provider_type_options)
+    food_types = st.multiselect("Food Types", food_type_options)
     
     st.subheader("📊 Analysis Mode")
     analysis_mode = st.radio("Select Mode", ["Dashboard Overview", "Detailed Query Analysis", "Predictive Analytics", "Comparative Analysis"])
 
-# =========================
-# Header
-# =========================
-st.markdown(
-    """
-    <div style="padding:20px; border-radius:15px; background: linear-gradient(90deg, #6a11cb, #2575fc); text-align:center;">
-        <h1 style="color:white;">🍽️ FoodRescue Analytics Hub</h1>
-        <h3 style="color:white;">Advanced Food Wastage Management & Analytics Platform</h3>
-    </div>
-    """, unsafe_allow_html=True
-)
+filters = FilterPredicate.from_sidebar(selected_cities, start_date, end_date, provider_types, food_types)
 
 st.markdown("## 🔍 Advanced Query Analysis")
 
 # =========================
 # Query Selection
 # =========================
-categories = {
-    "Provider Analysis": [
-        "Q1. Providers by City",
-        "Q3. Top Provider Types",
-        "Q7. Provider with Maximum Contribution",
-        "Q12. Avg. Food per Provider Type",
-        "Q21. Provider Contribution Distribution",
-        "Q25. Top 10 Providers by Contribution"
-    ],
-    "Receiver Analysis": [
-        "Q2. Receivers by City",
-        "Q10. Receiver Claiming the Most Food",
-        "Q14. Receiver Type Benefiting Most",
-        "Q22. Receiver Claim Distribution"
-    ],
-    "Listings & Food Analysis": [
-        "Q5. Cities with Highest Food Listings",
-        "Q6. Most Common Food Type",
-        "Q15. Monthly Trend of Food Listings",
-        "Q19. Listings by Category per City",
-        "Q23. Food Availability Heatmap"
-    ],
-    "Claims & Wastage": [
-        "Q8. Number of Claims per City",
-        "Q9. Success Rate of Claims",
-        "Q11. City Wasting the Most Food",
-        "Q13. City with Highest Claim Success Rate",
-        "Q17. Provider Type Wasting the Least",
-        "Q24. Wastage Reduction Trend"
-    ],
-    "Supply vs Demand": [
-        "Q18. Demand vs Supply per City",
-        "Q20. Most Balanced Supply-Demand City"
-    ]
-}
+# Menu, handlers and charts all come from the query registry
+categories = registry.menu()
 
 category = st.selectbox("Select Analysis Category", list(categories.keys()))
 query_choice = st.selectbox("Select Specific Query", categories[category])
+startup.record("first paint", time.perf_counter() - script_started)
 
 # =========================
 # Query Execution
 # =========================
 st.markdown(f"### 📊 Analysis Results: {query_choice}")
 
-if query_choice.startswith("Q1"):
-    result = provider_df.groupby("City")["Name"].count().reset_index(name="Providers")
-    top = result.sort_values("Providers", ascending=False).head(15)
-
+view = registry.view_for(query_choice)
+# Nothing is read yet: each table loads when the view first touches it, and
+# only the columns the view (and the filters) need
+data = store.dataset(filters, registry.required_columns([view]))
+
+def claim_view(name):
+    # Claim rollups answer the claim views whenever the filters fit their keys
+    rollups = load_claim_rollups(data_version(["receivers.csv"]))
+    if rollups.supports(filters):
+        rollups.refresh()
+        return getattr(rollups, name)(filters)
+    return getattr(analytics, name)(data)
+
+def summary_view(name):
+    # Summary tables answer the KPI views whenever the date range is whole months
+    summaries = load_summaries()
+    if summaries.supports(filters):
+        try:
+            summaries.refresh()
+        except Exception:  # the fact tables still answer; the scheduler retries the refresh
+            logging.getLogger(__name__).warning("Summary refresh failed, answering %s from the facts", name, exc_info=True)
+        else:
+            return getattr(summaries, name)(filters)
+    return getattr(analytics, name)(data)
+
+# Every stage of this run is timed and appended to snapshots/query_log.jsonl
+trace = QueryTrace(view.title, filters)
+
+def partition_view(name):
+    # Per-day rollups of the month partitions answer the trend views under date-only filters
+    partitions = load_partitions()
+    if partitions.supports(filters):
+        return getattr(partitions, name)(filters)
+    return getattr(analytics, name)(data)
+
+def expiry_view(name):
+    # The expiry index walks only the hours in the date range, for any city selection
+    index = load_expiry_index(version)
+    if index.supports(filters):
+        return getattr(index, name)(filters, now=now)
+    return getattr(analytics, name)(data, now=now)
+
+def run(view):
+    if view.source == "rollups":
+        return claim_view(view.name)
+    if view.source == "summaries":
+        return summary_view(view.name)
+    if view.source == "partitions":
+        return partition_view(view.name)
+    if view.source == "expiry":
+        return expiry_view(view.name)
+    return view.compute(data)
+
+def compute():
+    inputs = None
+    if view.source == "facts":
+        # Touch the inputs first so reads and joins are timed apart from the aggregation
+        with trace.stage("load") as stage:
+            stage["rows_out"] = inputs = [getattr(data, name) for name in registry.required_columns([view])]
+        joins = [use for use in view.uses if use in FACT_COLUMNS]
+        if joins:
+            with trace.stage("merge", rows_in=inputs) as stage:
+                stage["rows_out"] = inputs = [getattr(data, name) for name in joins]
+    with trace.stage("aggregate" if view.source == "facts" else view.source, rows_in=inputs) as stage:
+        stage["rows_out"] = result = run(view)
+    return result
+
+def chart(kind, result, **spec):
+    # Only the selected view draws; large categorical axes go to a native
+    # browser-side chart, everything else is a PNG cached by result content
+    if not charts.has_data(kind, result, **spec):
+        return
+    with trace.stage("plot", rows_in=result):
+        if charts.wants_native(kind, result, **spec):
+            st.altair_chart(charts.native_chart(kind, result, **spec))
+        else:
+            st.image(charts.cached_png(kind, result, **spec))
+
+def show_table(result, **kwargs):
+    # st.dataframe converts the frame to Arrow for the browser on the spot
+    with trace.stage("serialize", rows_in=result):
+        st.dataframe(result, **kwargs)
+
+# Same view, filters and data version -> same table, whoever asked first. What counts as
+# expired moves with the clock, so the expiry views are also keyed on the minute
+now = pd.Timestamp.now().floor("min")
+result_key = results.make_key(view.name, filters, (version, now) if view.source == "expiry" else version)
+with trace.stage("result cache") as stage:
+    stage["rows_out"] = result = results.get(result_key)
+if result is None:
+    result = compute()
+    results.put(result_key, result)
+
+if view.layout == "side_by_side":
     col1, col2 = st.columns([2,1])
     with col1:
-        fig, ax = plt.subplots(figsize=(8,5))
-        sns.barplot(data=top, x="City", y="Providers", ax=ax)
-        plt.xticks(rotation=45)
-        st.pyplot(fig)
+        chart(view.chart[0], result, **view.chart[1])
     with col2:
-        st.dataframe(top)
-
-elif query_choice.startswith("Q2"):
-    result = receiver_df.groupby("City")["Name"].count().reset_index(name="Receivers")
-    st.dataframe(result)
-
-elif query_choice.startswith("Q10"):
-    df = claims_df.merge(receiver_df, on="Receiver_ID", how="left")
-    result = df.groupby("Name")["Claim_ID"].count().reset_index(name="Claims").sort_values("Claims", ascending=False).head(10)
-    st.dataframe(result)
-    st.bar_chart(result.set_index("Name"))
-
-# ⚠️ # ---------------------------
-# Q3 – Q25 (drop-in handlers)
-# ---------------------------
-
-elif query_choice.startswith("Q3"):
-    # Which type of food provider contributes the most food?
-    df = listings_df.merge(
-        provider_df[["Provider_ID", "Type"]], on="Provider_ID", how="left"
-    )
-    result = df.groupby("Type")["Quantity"].sum().reset_index().sort_values(
-        "Quantity", ascending=False
-    )
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="Type", y="Quantity", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Total Quantity by Provider Type")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q4"):
-    # Contact info of food providers in a city
-    df = provider_df.copy()
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    view = df[["Name", "Type", "City", "Contact", "Address"]].sort_values(["City", "Name"])
-    st.dataframe(view, use_container_width=True)
-
-elif query_choice.startswith("Q5"):
-    # Cities with highest number of food listings
-    df = listings_df.merge(
-        provider_df[["Provider_ID", "City"]], on="Provider_ID", how="left"
-    )
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    result = (
-        df.groupby("City")["Food_ID"].count().reset_index(name="Listings")
-        .sort_values("Listings", ascending=False)
-        .head(15)
-    )
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="City", y="Listings", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Top Cities by Number of Listings")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q6"):
-    # Most commonly listed food type
-    df = listings_df.copy()
-    result = (
-        df["Food_Type"].value_counts().reset_index()
-        .rename(columns={"index": "Food Type", "Food_Type": "Count"})
-    )
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="Food Type", y="Count", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Most Commonly Listed Food Types")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q7"):
-    # Provider with maximum food contribution
-    df = listings_df.merge(
-        provider_df[["Provider_ID", "Name", "City"]], on="Provider_ID", how="left"
-    )
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    result = (
-        df.groupby("Name")["Quantity"].sum().reset_index()
-        .sort_values("Quantity", ascending=False)
-        .head(10)
-    )
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="Name", y="Quantity", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Top 10 Providers by Total Quantity")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q8"):
-    # Number of claims in each city
-    df = claims_df.merge(
-        receiver_df[["Receiver_ID", "City"]], on="Receiver_ID", how="left"
-    )
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    result = (
-        df.groupby("City")["Claim_ID"].count().reset_index(name="Claims")
-        .sort_values("Claims", ascending=False)
-    )
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="City", y="Claims", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Claims by City")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q9"):
-    # Success rate of claims (Completed / total)
-    result = (
-        claims_df["Status"].value_counts(normalize=True)
-        .reset_index()
-        .rename(columns={"index": "Status", "Status": "Rate"})
-    )
-    result["Rate"] = (result["Rate"] * 100).round(2)
-    st.dataframe(result)
-    fig, ax = plt.subplots()
-    ax.pie(result["Rate"], labels=result["Status"], autopct="%1.1f%%")
-    ax.set_title("Claim Status Distribution")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q10"):
-    # Receiver claiming the most food (by claim count)
-    df = claims_df.merge(
-        receiver_df[["Receiver_ID", "Name", "City"]], on="Receiver_ID", how="left"
-    )
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    result = (
-        df.groupby("Name")["Claim_ID"].count().reset_index(name="Claims")
-        .sort_values("Claims", ascending=False)
-        .head(10)
-    )
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="Name", y="Claims", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Top Receivers by Number of Claims")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q11"):
-    # City wasting the most food (listings with zero claims)
-    claims_per_listing = (
-        claims_df.groupby("Food_ID")["Claim_ID"].count().rename("ClaimCount")
-    )
-    df = listings_df.merge(claims_per_listing, on="Food_ID", how="left")
-    df["ClaimCount"] = df["ClaimCount"].fillna(0)
-    df = df.merge(provider_df[["Provider_ID", "City"]], on="Provider_ID", how="left")
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    df["Unclaimed_Item"] = (df["ClaimCount"] == 0).astype(int)
-    result = df.groupby("City")["Unclaimed_Item"].sum().reset_index()
-    result = result.rename(columns={"Unclaimed_Item": "Unclaimed Listings"}).sort_values(
-        "Unclaimed Listings", ascending=False
-    )
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="City", y="Unclaimed Listings", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Unclaimed Listings by City")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q12"):
-    # Average food quantity provided per provider type
-    df = listings_df.merge(
-        provider_df[["Provider_ID", "Type"]], on="Provider_ID", how="left"
-    )
-    result = df.groupby("Type")["Quantity"].mean().reset_index().sort_values(
-        "Quantity", ascending=False
-    )
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="Type", y="Quantity", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Average Quantity per Provider Type")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q13"):
-    # City with highest average claim success rate
-    df = claims_df.merge(
-        receiver_df[["Receiver_ID", "City"]], on="Receiver_ID", how="left"
-    )
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    result = (
-        df.groupby("City")["Status"]
-        .apply(lambda s: (s == "Completed").mean())
-        .reset_index(name="Success_Rate")
-        .sort_values("Success_Rate", ascending=False)
-    )
-    result["Success_Rate"] = (result["Success_Rate"] * 100).round(2)
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="City", y="Success_Rate", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Claim Success Rate by City (%)")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q14"):
-    # Receiver type benefiting the most (by claim count)
-    df = claims_df.merge(
-        receiver_df[["Receiver_ID", "Type", "City"]], on="Receiver_ID", how="left"
-    )
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    result = (
-        df.groupby("Type")["Claim_ID"].count().reset_index(name="Claims")
-        .sort_values("Claims", ascending=False)
-    )
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="Type", y="Claims", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Claims by Receiver Type")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q15"):
-    # Monthly trend of food listings (by Expiry month as proxy)
-    df = listings_df.copy()
-    df["Expiry_Date"] = pd.to_datetime(df["Expiry_Date"], errors="coerce")
-    df = df.merge(provider_df[["Provider_ID", "City"]], on="Provider_ID", how="left")
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    df["Month"] = df["Expiry_Date"].dt.to_period("M").astype(str)
-    result = df.groupby("Month")["Food_ID"].count().reset_index(name="Listings")
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.lineplot(data=result, x="Month", y="Listings", marker="o", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Monthly Trend of Food Listings (by Expiry Month)")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q16"):
-    # Monthly trend of food claims
-    df = claims_df.copy()
-    df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
-    df = df.merge(receiver_df[["Receiver_ID", "City"]], on="Receiver_ID", how="left")
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    df["Month"] = df["Timestamp"].dt.to_period("M").astype(str)
-    result = df.groupby("Month")["Claim_ID"].count().reset_index(name="Claims")
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.lineplot(data=result, x="Month", y="Claims", marker="o", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Monthly Trend of Claims")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q17"):
-    # Provider type wasting the least (lowest share of unclaimed listings)
-    claims_per_listing = (
-        claims_df.groupby("Food_ID")["Claim_ID"].count().rename("ClaimCount")
-    )
-    df = listings_df.merge(claims_per_listing, on="Food_ID", how="left")
-    df["ClaimCount"] = df["ClaimCount"].fillna(0)
-    df = df.merge(provider_df[["Provider_ID", "Type"]], on="Provider_ID", how="left")
-    agg = df.groupby("Type").agg(
-        total_listings=("Food_ID", "count"),
-        unclaimed=("ClaimCount", lambda x: (x == 0).sum()),
-    )
-    agg["Unclaimed_Rate"] = (agg["unclaimed"] / agg["total_listings"] * 100).round(2)
-    result = agg.reset_index().sort_values("Unclaimed_Rate", ascending=True)
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="Type", y="Unclaimed_Rate", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Unclaimed Listings Rate by Provider Type (%) – Lower is Better")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q18"):
-    # Demand vs provider supply per city (units differ; shown side-by-side)
-    supply = (
-        listings_df.merge(provider_df[["Provider_ID", "City"]], on="Provider_ID", how="left")
-        .groupby("City")["Quantity"].sum()
-        .reset_index(name="Supply")
-    )
-    demand = (
-        claims_df.merge(receiver_df[["Receiver_ID", "City"]], on="Receiver_ID", how="left")
-        .groupby("City")["Claim_ID"].count()
-        .reset_index(name="Demand")
-    )
-    result = pd.merge(supply, demand, on="City", how="outer").fillna(0)
-    if selected_cities:
-        result = result[result["City"].isin(selected_cities)]
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    result.set_index("City")[["Supply", "Demand"]].plot(kind="bar", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Supply (Quantity) vs Demand (Claims) per City")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q19"):
-    # Listings by category (Food_Type) per city
-    df = listings_df.merge(
-        provider_df[["Provider_ID", "City"]], on="Provider_ID", how="left"
-    )
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    result = (
-        df.groupby(["City", "Food_Type"])["Food_ID"].count().reset_index(name="Listings")
-    )
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="City", y="Listings", hue="Food_Type", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Listings by City & Food Type")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q20"):
-    # Most balanced supply-demand city (min |normalized supply - normalized demand|)
-    supply = (
-        listings_df.merge(provider_df[["Provider_ID", "City"]], on="Provider_ID", how="left")
-        .groupby("City")["Quantity"].sum()
-        .reset_index(name="Supply")
-    )
-    demand = (
-        claims_df.merge(receiver_df[["Receiver_ID", "City"]], on="Receiver_ID", how="left")
-        .groupby("City")["Claim_ID"].count()
-        .reset_index(name="Demand")
-    )
-    tmp = pd.merge(supply, demand, on="City", how="outer").fillna(0)
-    # Min-max normalize to 0–1
-    for col in ["Supply", "Demand"]:
-        col_min, col_max = tmp[col].min(), tmp[col].max()
-        if col_max > col_min:
-            tmp[col + "_norm"] = (tmp[col] - col_min) / (col_max - col_min)
-        else:
-            tmp[col + "_norm"] = 0.0
-    tmp["Balance_Gap"] = (tmp["Supply_norm"] - tmp["Demand_norm"]).abs()
-    result = tmp.sort_values("Balance_Gap").head(10)[["City", "Supply", "Demand", "Balance_Gap"]]
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="City", y="Balance_Gap", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Most Balanced Cities (Lower Gap = Better)")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q21"):
-    # Provider contribution distribution by type
-    df = listings_df.merge(
-        provider_df[["Provider_ID", "Type"]], on="Provider_ID", how="left"
-    )
-    result = df.groupby("Type")["Quantity"].sum().reset_index()
-    st.dataframe(result)
-    fig, ax = plt.subplots()
-    ax.pie(result["Quantity"], labels=result["Type"], autopct="%1.1f%%")
-    ax.set_title("Provider Contribution Distribution")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q22"):
-    # Receiver claim distribution by type
-    df = claims_df.merge(
-        receiver_df[["Receiver_ID", "Type"]], on="Receiver_ID", how="left"
-    )
-    result = df.groupby("Type")["Claim_ID"].count().reset_index(name="Claims")
-    st.dataframe(result)
-    fig, ax = plt.subplots()
-    ax.pie(result["Claims"], labels=result["Type"], autopct="%1.1f%%")
-    ax.set_title("Receiver Claim Distribution")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q23"):
-    # Food availability heatmap by city (sum quantity)
-    df = listings_df.merge(
-        provider_df[["Provider_ID", "City"]], on="Provider_ID", how="left"
-    )
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    pivot = df.pivot_table(
-        index="Food_Type", columns="City", values="Quantity", aggfunc="sum", fill_value=0
-    )
-    st.dataframe(pivot)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.heatmap(pivot, annot=True, fmt="g", cmap="YlGnBu", ax=ax)
-    plt.title("Food Availability (Quantity) Heatmap")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q24"):
-    # Wastage reduction trend over time (share of listings that are unclaimed)
-    claims_per_listing = (
-        claims_df.groupby("Food_ID")["Claim_ID"].count().rename("ClaimCount")
-    )
-    df = listings_df.merge(claims_per_listing, on="Food_ID", how="left").copy()
-    df["ClaimCount"] = df["ClaimCount"].fillna(0)
-    df["Expiry_Date"] = pd.to_datetime(df["Expiry_Date"], errors="coerce")
-    df["Month"] = df["Expiry_Date"].dt.to_period("M").astype(str)
-    monthly = df.groupby("Month").agg(
-        listings=("Food_ID", "count"),
-        unclaimed=("ClaimCount", lambda x: (x == 0).sum()),
-    ).reset_index()
-    monthly["Unclaimed_Rate_%"] = (monthly["unclaimed"] / monthly["listings"] * 100).round(2)
-    st.dataframe(monthly[["Month", "listings", "unclaimed", "Unclaimed_Rate_%"]])
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.lineplot(data=monthly, x="Month", y="Unclaimed_Rate_%", marker="o", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Unclaimed Listings Rate Over Time (%)")
-    st.pyplot(fig)
-
-elif query_choice.startswith("Q25"):
-    # Top 10 providers by total food contribution
-    df = listings_df.merge(
-        provider_df[["Provider_ID", "Name", "City"]], on="Provider_ID", how="left"
-    )
-    if selected_cities:
-        df = df[df["City"].isin(selected_cities)]
-    result = (
-        df.groupby("Name")["Quantity"].sum().reset_index()
-        .sort_values("Quantity", ascending=False)
-        .head(10)
-    )
-    st.dataframe(result)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(data=result, x="Name", y="Quantity", ax=ax)
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Top 10 Providers by Total Quantity")
-    st.pyplot(fig)
-
+        show_table(result)
+else:
+    if view.layout == "wide_table":
+        show_table(result, width="stretch")
+    else:
+        show_table(result)
+    if view.chart:
+        chart(view.chart[0], result, **view.chart[1])
+
+query_record = trace.finish()
+if events is not None:
+    events.record("dashboard_query", query_record)
+
+# Shown after the query ran, so the counts include this run
+stats = results.metrics()
+st.sidebar.caption(
+    f"Result cache: {stats['hits']} hits / {stats['misses']} misses "
+    f"({stats['hit_rate']:.0%}), {stats['entries']} entries"
+)
 
+startup.record("first view", time.perf_counter() - script_started)
+startup.finish()
+with st.sidebar.expander("⏱️ Startup report"):
+    st.dataframe(pd.DataFrame(startup.rows(store.load_times), columns=["Phase", "Seconds"]))
+
+if st.sidebar.checkbox("🩺 Show diagnostics"):
+    with st.sidebar:
+        st.caption(f"{view.title}: {trace.total() * 1000:.0f} ms this run")
+        st.dataframe(trace.frame())
+        st.caption("Recent runs, slowest first")
+        st.dataframe(summarize(read_log(limit=1000)))
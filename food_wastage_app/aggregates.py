@@ -0,0 +1,26 @@
+import pandas as pd
+
+# Vectorized aggregation primitives shared by the views. Each one builds a
+# boolean/numeric column once and reduces it with a built-in groupby
+# aggregation, instead of calling a Python lambda per group.
+
+
+def status_rate(df, by, status="Completed", column="Status"):
+    """Share of rows per group whose ``column`` equals ``status`` (0–1)"""
+    return df[column].eq(status).groupby(df[by], observed=True).mean()
+
+
+def unclaimed_counts(df, by, total="listings", unclaimed="unclaimed"):
+    """Listings and listings with no claims per group"""
+    flags = pd.DataFrame({total: df["Food_ID"], unclaimed: df["ClaimCount"].eq(0)})
+    return flags.groupby(df[by], observed=True).agg({total: "count", unclaimed: "sum"})
+
+
+def share_of_total(values):
+    """Each value's share of the column total (0–1)"""
+    return values / values.sum()
+
+
+def as_percent(rates, decimals=2):
+    """0–1 rates as rounded percentages"""
+    return (rates * 100).round(decimals)
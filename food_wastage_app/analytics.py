@@ -0,0 +1,205 @@
+import pandas as pd
+
+from food_wastage_app.aggregates import as_percent, share_of_total, status_rate, unclaimed_counts
+from food_wastage_app.schema import as_datetime, month_of
+
+# Result tables behind the dashboard views (see registry.VIEWS). Every function takes the
+# loaded Dataset (see facts.load_dataset and store.DataStore), already narrowed to the sidebar
+# filters, and returns the table the view renders.
+
+
+def _supply_demand(data):
+    supply = (
+        data.listing_facts.groupby("City", observed=True)["Quantity"].sum()
+        .reset_index(name="Supply")
+    )
+    demand = (
+        data.claim_facts.groupby("City", observed=True)["Claim_ID"].count()
+        .reset_index(name="Demand")
+    )
+    return pd.merge(supply, demand, on="City", how="outer").fillna(0)
+
+
+def providers_by_city(data):
+    result = data.providers.groupby("City", observed=True)["Name"].count().reset_index(name="Providers")
+    return result.sort_values("Providers", ascending=False).head(15)
+
+
+def receivers_by_city(data):
+    return data.receivers.groupby("City", observed=True)["Name"].count().reset_index(name="Receivers")
+
+
+def quantity_by_provider_type(data):
+    return data.listing_facts.groupby("Type", observed=True)["Quantity"].sum().reset_index().sort_values(
+        "Quantity", ascending=False
+    )
+
+
+def provider_contacts(data):
+    return data.providers[["Name", "Type", "City", "Contact", "Address"]].sort_values(["City", "Name"])
+
+
+def listings_by_city(data):
+    df = data.listing_facts
+    return (
+        df.groupby("City", observed=True)["Food_ID"].count().reset_index(name="Listings")
+        .sort_values("Listings", ascending=False)
+        .head(15)
+    )
+
+
+def food_type_counts(data):
+    counts = data.listing_facts["Food_Type"].value_counts()
+    # Categorical value_counts also lists categories the filters emptied
+    return counts[counts > 0].rename_axis("Food Type").reset_index(name="Count")
+
+
+def top_providers_by_quantity(data):
+    df = data.listing_facts
+    return (
+        df.groupby("Name")["Quantity"].sum().reset_index()
+        .sort_values("Quantity", ascending=False)
+        .head(10)
+    )
+
+
+def claims_by_city(data):
+    df = data.claim_facts
+    return (
+        df.groupby("City", observed=True)["Claim_ID"].count().reset_index(name="Claims")
+        .sort_values("Claims", ascending=False)
+    )
+
+
+def claim_status_rates(data):
+    counts = data.claim_facts["Status"].value_counts()
+    counts = counts[counts > 0]
+    return as_percent(share_of_total(counts)).rename_axis("Status").reset_index(name="Rate")
+
+
+def top_receivers_by_claims(data):
+    df = data.claim_facts
+    return (
+        df.groupby("Name")["Claim_ID"].count().reset_index(name="Claims")
+        .sort_values("Claims", ascending=False)
+        .head(10)
+    )
+
+
+def unclaimed_by_city(data):
+    result = unclaimed_counts(data.listing_facts, "City", unclaimed="Unclaimed Listings")
+    return result[["Unclaimed Listings"]].reset_index().sort_values("Unclaimed Listings", ascending=False)
+
+
+def avg_quantity_by_provider_type(data):
+    return data.listing_facts.groupby("Type", observed=True)["Quantity"].mean().reset_index().sort_values(
+        "Quantity", ascending=False
+    )
+
+
+def success_rate_by_city(data):
+    result = status_rate(data.claim_facts, "City").reset_index(name="Success_Rate")
+    result = result.sort_values("Success_Rate", ascending=False)
+    result["Success_Rate"] = as_percent(result["Success_Rate"])
+    return result
+
+
+def claims_by_receiver_type(data):
+    df = data.claim_facts
+    return (
+        df.groupby("Type", observed=True)["Claim_ID"].count().reset_index(name="Claims")
+        .sort_values("Claims", ascending=False)
+    )
+
+
+def monthly_listings(data):
+    # Expiry month is used as a proxy for the listing month
+    df = data.listing_facts
+    month = month_of(df["Expiry_Date"]).rename("Month")
+    return df.groupby(month)["Food_ID"].count().reset_index(name="Listings")
+
+
+def monthly_quantity(data):
+    # Expiry month again stands in for the listing month (listings.csv has no listing date)
+    df = data.listing_facts
+    month = month_of(df["Expiry_Date"]).rename("Month")
+    return df.groupby(month)["Quantity"].sum().astype("int64").reset_index()
+
+
+def monthly_claims(data):
+    df = data.claim_facts
+    month = month_of(df["Timestamp"]).rename("Month")
+    return df.groupby(month)["Claim_ID"].count().reset_index(name="Claims")
+
+
+def claims_by_weekday(data):
+    df = data.claim_facts
+    day = as_datetime(df["Timestamp"]).dt.day_name().rename("Day")
+    return (
+        df.groupby(day)["Claim_ID"].count().reset_index(name="Claims")
+        .sort_values("Claims", ascending=False, kind="stable", ignore_index=True)
+    )
+
+
+def expiring_soon(data, limit=50, now=None):
+    # Unclaimed listings in the date range still good at ``now``, soonest expiry first;
+    # a listing is good through its expiry date
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    df = data.listing_facts
+    expiry = as_datetime(df["Expiry_Date"])
+    df = df[df["ClaimCount"].eq(0) & (expiry.dt.normalize() + pd.Timedelta(days=1)).ge(now)]
+    df = df.sort_values(["Expiry_Date", "Food_ID"], kind="stable").head(limit)
+    return df[["Food_ID", "Food_Name", "City", "Food_Type", "Quantity", "Expiry_Date"]].reset_index(drop=True)
+
+
+def unclaimed_rate_by_provider_type(data):
+    agg = unclaimed_counts(data.listing_facts, "Type", total="total_listings")
+    agg["Unclaimed_Rate"] = as_percent(agg["unclaimed"] / agg["total_listings"])
+    return agg.reset_index().sort_values("Unclaimed_Rate", ascending=True)
+
+
+def supply_vs_demand(data):
+    # Units differ (quantity vs claim count); shown side by side
+    return _supply_demand(data)
+
+
+def listings_by_city_and_food_type(data):
+    df = data.listing_facts
+    return df.groupby(["City", "Food_Type"], observed=True)["Food_ID"].count().reset_index(name="Listings")
+
+
+def balanced_cities(data):
+    # Most balanced: smallest gap between min-max normalised supply and demand
+    tmp = _supply_demand(data)
+    for col in ["Supply", "Demand"]:
+        col_min, col_max = tmp[col].min(), tmp[col].max()
+        if col_max > col_min:
+            tmp[col + "_norm"] = (tmp[col] - col_min) / (col_max - col_min)
+        else:
+            tmp[col + "_norm"] = 0.0
+    tmp["Balance_Gap"] = (tmp["Supply_norm"] - tmp["Demand_norm"]).abs()
+    return tmp.sort_values("Balance_Gap").head(10)[["City", "Supply", "Demand", "Balance_Gap"]]
+
+
+def contribution_by_provider_type(data):
+    return data.listing_facts.groupby("Type", observed=True)["Quantity"].sum().reset_index()
+
+
+def claim_share_by_receiver_type(data):
+    return data.claim_facts.groupby("Type", observed=True)["Claim_ID"].count().reset_index(name="Claims")
+
+
+def availability_heatmap(data):
+    df = data.listing_facts
+    return df.pivot_table(
+        index="Food_Type", columns="City", values="Quantity", aggfunc="sum", fill_value=0, observed=True
+    )
+
+
+def unclaimed_trend(data):
+    df = data.listing_facts.copy()
+    df["Month"] = month_of(df["Expiry_Date"])
+    monthly = unclaimed_counts(df, "Month").reset_index()
+    monthly["Unclaimed_Rate_%"] = as_percent(monthly["unclaimed"] / monthly["listings"])
+    return monthly[["Month", "listings", "unclaimed", "Unclaimed_Rate_%"]]
+
@@ -0,0 +1,252 @@
+"""Benchmark the app.py views and queries.py SQL on synthetic data.
+
+    python -m food_wastage_app.benchmark --scales 1 100 1000 --output bench_report.json
+    python -m food_wastage_app.benchmark --compare old_report.json new_report.json
+    python -m food_wastage_app.benchmark --primitives 10000000
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from food_wastage_app import aggregates, registry, synthetic
+from food_wastage_app.engine import SQLiteEngine
+from food_wastage_app.facts import build_dataset
+from food_wastage_app.queries import queries
+from food_wastage_app.snapshots import drop_unused_categories, read_table
+
+DATA_DIR = "bench_data"
+TABLES = ["providers", "receivers", "listings", "claims"]
+SQL_TABLE_NAMES = {
+    "providers": "providers_data",
+    "receivers": "receivers_data",
+    "listings": "food_listings_data",
+    "claims": "claims_data",
+}
+
+
+def measure(fn, *args):
+    """Run ``fn`` and return (result, seconds, peak traced MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def render_prep(result):
+    """What the app does before drawing: tidy categories and serialise like st.dataframe"""
+    result = drop_unused_categories(result)
+    try:
+        import pyarrow as pa
+        pa.Table.from_pandas(result)
+    except ImportError:
+        result.to_dict("records")
+    return result
+
+
+def prepare_data(scale, data_dir=DATA_DIR, seed=0):
+    """Generate (or reuse) the synthetic CSVs for one scale"""
+    out_dir = os.path.join(data_dir, f"scale_{scale}")
+    paths = {name: os.path.join(out_dir, f"{name}.csv") for name in TABLES}
+    if not all(os.path.exists(path) for path in paths.values()):
+        paths = synthetic.write_csvs(out_dir, scale, seed)
+    return out_dir, paths
+
+
+def load_tables(paths, snapshot_dir):
+    return {name: read_table(path, snapshot_dir=snapshot_dir) for name, path in paths.items()}
+
+
+def bench_scale(scale, data_dir=DATA_DIR, suites=("app", "sql")):
+    """Time every query at one scale and return a list of result records"""
+    out_dir, paths = prepare_data(scale, data_dir)
+    snapshot_dir = os.path.join(out_dir, "snapshots")
+    records = []
+
+    # Cold load parses the CSVs and writes snapshots; warm load reads them back
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+    _, cold_load, cold_mb = measure(load_tables, paths, snapshot_dir)
+    tables, load, load_mb = measure(load_tables, paths, snapshot_dir)
+    data, join, join_mb = measure(
+        build_dataset, tables["providers"], tables["receivers"], tables["listings"], tables["claims"]
+    )
+    records.append({
+        "scale": scale, "suite": "setup", "query": "load+join",
+        "cold_load_s": cold_load, "load_s": load, "join_s": join,
+        "peak_mb": max(cold_mb, load_mb, join_mb),
+        "rows": {name: len(df) for name, df in tables.items()},
+    })
+
+    if "app" in suites:
+        for query_id, view in registry.VIEWS.items():
+            fn = view.compute
+            result, aggregate, agg_mb = measure(fn, data)
+            _, render, render_mb = measure(render_prep, result)
+            records.append({
+                "scale": scale, "suite": "app", "query": f"Q{query_id}", "name": fn.__name__,
+                "load_s": load, "join_s": join, "aggregate_s": aggregate, "render_prep_s": render,
+                "end_to_end_s": load + join + aggregate + render,
+                "peak_mb": max(agg_mb, render_mb), "rows_out": len(result),
+            })
+
+    if "sql" in suites:
+        sql_tables = {SQL_TABLE_NAMES[name]: df.rename(columns=str.lower) for name, df in tables.items()}
+        engine, engine_load, engine_mb = measure(SQLiteEngine.from_tables, sql_tables)
+        city = tables["providers"]["City"].iloc[0]
+        for query_id in queries:
+            params = (city,) if query_id == 4 else ()
+            try:
+                result, aggregate, agg_mb = measure(engine.run, query_id, params)
+            except Exception as exc:  # e.g. columns the CSV source does not carry
+                records.append({"scale": scale, "suite": "sql", "query": f"Q{query_id}", "error": " ".join(str(exc).split())[:200]})
+                continue
+            records.append({
+                "scale": scale, "suite": "sql", "query": f"Q{query_id}",
+                "load_s": load + engine_load, "aggregate_s": aggregate,
+                "end_to_end_s": load + engine_load + aggregate,
+                "peak_mb": max(engine_mb, agg_mb), "rows_out": len(result),
+            })
+    return records
+
+
+def primitive_frames(rows, seed=0):
+    """Claim-shaped and listing-shaped frames with ``rows`` rows for the primitive checks"""
+    rng = np.random.default_rng(seed)
+    cities = pd.Categorical.from_codes(rng.integers(0, 500, rows), [f"City {i}" for i in range(500)])
+    claims = pd.DataFrame({
+        "City": cities,
+        "Status": pd.Series(rng.choice(synthetic.STATUSES, rows), dtype="str"),
+    })
+    listings = pd.DataFrame({
+        "Food_ID": np.arange(rows),
+        "Type": pd.Categorical.from_codes(rng.integers(0, 4, rows), synthetic.PROVIDER_TYPES),
+        "Month": pd.Series(rng.choice([f"2025-{m:02d}" for m in range(1, 13)], rows), dtype="str"),
+        "ClaimCount": rng.poisson(1.0, rows),
+    })
+    return claims, listings
+
+
+# The per-group lambdas the primitives replaced, kept as the reference output
+PRIMITIVE_CASES = {
+    "status_rate": (
+        lambda claims, listings: claims.groupby("City", observed=True)["Status"].apply(lambda s: (s == "Completed").mean()),
+        lambda claims, listings: aggregates.status_rate(claims, "City"),
+    ),
+    "unclaimed_counts/Type": (
+        lambda claims, listings: listings.groupby("Type", observed=True).agg(
+            listings=("Food_ID", "count"), unclaimed=("ClaimCount", lambda x: (x == 0).sum())
+        ),
+        lambda claims, listings: aggregates.unclaimed_counts(listings, "Type"),
+    ),
+    "unclaimed_counts/Month": (
+        lambda claims, listings: listings.groupby("Month").agg(
+            listings=("Food_ID", "count"), unclaimed=("ClaimCount", lambda x: (x == 0).sum())
+        ),
+        lambda claims, listings: aggregates.unclaimed_counts(listings, "Month"),
+    ),
+    "share_of_total": (
+        lambda claims, listings: claims["Status"].value_counts(normalize=True),
+        lambda claims, listings: aggregates.share_of_total(claims["Status"].value_counts()),
+    ),
+}
+
+
+def bench_primitives(rows, seed=0):
+    """Check each primitive matches the lambda it replaced and time both"""
+    claims, listings = primitive_frames(rows, seed)
+    records = []
+    for name, (reference, vectorized) in PRIMITIVE_CASES.items():
+        expected, reference_s, _ = measure(reference, claims, listings)
+        result, vectorized_s, _ = measure(vectorized, claims, listings)
+        if isinstance(expected, pd.DataFrame):
+            pd.testing.assert_frame_equal(result, expected, check_names=False)
+        else:
+            pd.testing.assert_series_equal(result, expected, check_names=False)
+        records.append({
+            "suite": "primitives", "query": name, "rows": rows,
+            "reference_s": reference_s, "vectorized_s": vectorized_s,
+            "speedup": reference_s / max(vectorized_s, 1e-9),
+        })
+    return records
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales, output, data_dir=DATA_DIR, suites=("app", "sql")):
+    report = {
+        "commit": git_commit(),
+        "created": pd.Timestamp.now().isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "results": [],
+    }
+    for scale in scales:
+        report["results"].extend(bench_scale(scale, data_dir, suites))
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def compare(old_path, new_path, threshold=1.2):
+    """Print end-to-end time ratios between two reports and flag regressions"""
+    with open(old_path) as f:
+        old = {(r["scale"], r["suite"], r["query"]): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+    regressions = 0
+    for record in new:
+        key = (record["scale"], record["suite"], record["query"])
+        if key not in old or "end_to_end_s" not in record or "end_to_end_s" not in old[key]:
+            continue
+        ratio = record["end_to_end_s"] / max(old[key]["end_to_end_s"], 1e-9)
+        flag = "REGRESSION" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(f"{key[0]:>5}x {key[1]:<4} {key[2]:<4} {ratio:6.2f}x {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--suites", nargs="+", default=["app", "sql"], choices=["app", "sql"])
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--output", default="bench_report.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--primitives", type=int, metavar="ROWS")
+    args = parser.parse_args()
+
+    if args.primitives:
+        for record in bench_primitives(args.primitives):
+            print(f"{record['query']:<24} {record['reference_s']:8.3f}s -> {record['vectorized_s']:8.3f}s "
+                  f"({record['speedup']:.1f}x, output identical)")
+        return
+
+    if args.compare:
+        raise SystemExit(1 if compare(*args.compare) else 0)
+    report = run(args.scales, args.output, args.data_dir, args.suites)
+    for record in report["results"]:
+        timing = record.get("end_to_end_s", record.get("load_s", 0))
+        print(f"{record['scale']:>5}x {record['suite']:<5} {record['query']:<9} {timing:8.3f}s "
+              f"{record.get('peak_mb', 0):8.1f} MB {record.get('error', '')}")
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
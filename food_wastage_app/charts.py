@@ -0,0 +1,116 @@
+import hashlib
+import io
+
+import pandas as pd
+
+from food_wastage_app.results import ResultCache
+from food_wastage_app.snapshots import drop_unused_categories
+
+# Above these sizes the Agg render (and an annotated heatmap) gets slow and
+# unreadable, so charts switch to a native (Vega-Lite) chart instead
+NATIVE_MAX_CATEGORIES = 40
+NATIVE_MAX_CELLS = 400
+DPI = 100
+
+# Rendered PNGs keyed by chart spec + result content; no TTL since the key
+# already changes whenever the data does
+png_cache = ResultCache(max_entries=128, ttl=None)
+
+
+def result_hash(result):
+    """Content hash of a result table, including its index and column labels"""
+    digest = hashlib.sha256(repr((list(result.columns), list(result.dtypes.astype(str)))).encode())
+    digest.update(pd.util.hash_pandas_object(result, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def wants_native(kind, result, x=None, **spec):
+    """True when a chart is too large for a readable matplotlib render"""
+    if kind == "heatmap":
+        return result.size > NATIVE_MAX_CELLS
+    if kind in ("bar", "grouped_bar") and x is not None:
+        return result[x].nunique() > NATIVE_MAX_CATEGORIES
+    return False
+
+
+def has_data(kind, result, y=None, **spec):
+    """False for results a chart cannot show (an all-zero pie, an empty heatmap)"""
+    if kind == "pie":
+        return result[y].sum() > 0
+    return bool(result.size)
+
+
+def _draw(ax, kind, result, x=None, y=None, hue=None, labels=None):
+    import seaborn as sns
+
+    if kind == "bar":
+        sns.barplot(data=drop_unused_categories(result), x=x, y=y, hue=hue, ax=ax)
+    elif kind == "line":
+        sns.lineplot(data=result, x=x, y=y, marker="o", ax=ax)
+    elif kind == "grouped_bar":
+        result.set_index(x)[list(y)].plot(kind="bar", ax=ax)
+    elif kind == "pie":
+        ax.pie(result[y], labels=result[labels], autopct="%1.1f%%")
+    elif kind == "heatmap":
+        sns.heatmap(result, annot=True, fmt="g", cmap="YlGnBu", ax=ax)
+    else:
+        raise ValueError(f"Unknown chart kind: {kind}")
+
+
+def render_png(kind, result, title=None, figsize=(10, 6), rotate=True, **spec):
+    """Draw a chart to PNG bytes; the figure is always closed, even on error"""
+    # matplotlib/seaborn are only imported once a chart is actually drawn
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=figsize)
+    try:
+        _draw(ax, kind, result, **spec)
+        if rotate:
+            plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+        if title:
+            ax.set_title(title)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=DPI, bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def cached_png(kind, result, **spec):
+    """render_png, reusing the image when the same chart of the same result was drawn before"""
+    key = hashlib.sha256(repr((kind, sorted(spec.items()), result_hash(result))).encode()).hexdigest()
+    png = png_cache.get(key)
+    if png is None:
+        png = render_png(kind, result, **spec)
+        png_cache.put(key, png)
+    return png
+
+
+def native_chart(kind, result, title=None, x=None, y=None, hue=None, labels=None, **_):
+    """The same chart as a Vega-Lite (Altair) spec, drawn by the browser"""
+    import altair as alt
+
+    if kind == "heatmap":
+        data = result.rename_axis(index="row", columns="column").stack().reset_index(name="value")
+        data = data.astype({"row": str, "column": str})
+        chart = alt.Chart(data).mark_rect().encode(
+            x=alt.X("column:N", title=result.columns.name), y=alt.Y("row:N", title=result.index.name),
+            color=alt.Color("value:Q", scale=alt.Scale(scheme="yellowgreenblue")), tooltip=["row", "column", "value"],
+        )
+    elif kind == "grouped_bar":
+        data = result.melt(id_vars=[x], value_vars=list(y), var_name="series", value_name="value").astype({x: str})
+        chart = alt.Chart(data).mark_bar().encode(
+            x=alt.X(f"{x}:N", sort="-y"), xOffset="series:N", y="value:Q", color="series:N", tooltip=[x, "series", "value"],
+        )
+    elif kind == "pie":
+        data = result.astype({labels: str})
+        chart = alt.Chart(data).mark_arc().encode(theta=f"{y}:Q", color=f"{labels}:N", tooltip=[labels, y])
+    else:
+        data = drop_unused_categories(result).astype({x: str})
+        encoding = {"x": alt.X(f"{x}:N"), "y": f"{y}:Q", "tooltip": [str(col) for col in data.columns]}
+        if hue:
+            data = data.astype({hue: str})
+            encoding.update(color=f"{hue}:N", xOffset=f"{hue}:N")
+        chart = alt.Chart(data)
+        chart = (chart.mark_line(point=True) if kind == "line" else chart.mark_bar()).encode(**encoding)
+    return chart.properties(title=title or "")
@@ -0,0 +1,296 @@
+"""Pooled, WAL-mode access to food_wastage.db.
+
+    python -m food_wastage_app.dal --db food_wastage.db --status
+    python -m food_wastage_app.dal --bench                     # read latency while claims are written, WAL vs rollback journal
+    python -m food_wastage_app.dal --bench --scale 50 --readers 8 --seconds 5
+"""
+import argparse
+import os
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from food_wastage_app.database import DATABASE, to_db_frame
+
+# Compiled statements kept per connection; the SQL below is fixed text, so
+# every call after the first on a connection reuses its prepared statement
+STATEMENT_CACHE = 256
+
+# Per-connection settings. journal_mode is persistent (stored in the file);
+# synchronous=NORMAL is durable enough under WAL, where a commit only appends
+CONNECTION_PRAGMAS = [
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",  # KiB, i.e. 64 MB of page cache
+    "PRAGMA mmap_size = 268435456",
+]
+
+INSERT_CLAIM_SQL = """
+INSERT INTO claims (food_id, receiver_id, quantity_claimed, status, claim_timestamp)
+VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+"""
+UPDATE_CLAIM_STATUS_SQL = """
+UPDATE claims
+SET status = ?,
+    pickup_timestamp = CASE WHEN ? = 'picked_up' THEN CURRENT_TIMESTAMP ELSE pickup_timestamp END,
+    completion_timestamp = CASE WHEN ? = 'completed' THEN CURRENT_TIMESTAMP ELSE completion_timestamp END
+WHERE id = ?
+"""
+CLAIMS_BY_STATUS_SQL = "SELECT status, COUNT(*) AS claims FROM claims GROUP BY status"
+
+
+class ConnectionPool:
+    """Reader connections lent to one thread at a time, plus a single writer connection.
+
+    The database is switched to WAL journaling, so readers keep reading the
+    last committed snapshot while the writer appends a transaction: a
+    dashboard query never waits for a claim write, nor the write for it.
+    SQLite admits one writer at a time, so writes queue on a lock here
+    instead of failing with "database is locked". Connections live as long
+    as the pool, so each keeps its compiled statements across requests.
+    """
+
+    def __init__(self, path=DATABASE, readers=4, timeout=30.0, journal_mode="wal"):
+        self.path = path
+        self.timeout = timeout
+        self.write_lock = threading.Lock()
+        self.writer = self._connect()
+        # Set through the writer first; every connection opened afterwards sees the mode
+        self.journal_mode = self.writer.execute(f"PRAGMA journal_mode = {journal_mode}").fetchone()[0]
+        self.idle = queue.Queue()
+        self.readers = [self._connect(readonly=True) for _ in range(readers)]
+        for conn in self.readers:
+            self.idle.put(conn)
+
+    def _connect(self, readonly=False):
+        # Autocommit mode: transactions are begun explicitly in write()
+        conn = sqlite3.connect(
+            self.path, timeout=self.timeout, isolation_level=None,
+            check_same_thread=False, cached_statements=STATEMENT_CACHE,
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if readonly:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def read(self):
+        """A reader connection for the duration of the block"""
+        try:
+            conn = self.idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no free reader connection after {self.timeout}s") from None
+        try:
+            yield conn
+        finally:
+            self.idle.put(conn)
+
+    @contextmanager
+    def write(self, immediate=True):
+        """The writer connection inside one transaction, committed when the block exits cleanly.
+
+        ``immediate`` takes the database write lock up front rather than on the
+        first write; a block that only touches temp tables passes False and never takes it.
+        """
+        if not self.write_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"writer busy for {self.timeout}s")
+        try:
+            self.writer.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield self.writer
+            except BaseException:
+                self.writer.execute("ROLLBACK")
+                raise
+            self.writer.execute("COMMIT")
+        finally:
+            self.write_lock.release()
+
+    def close(self):
+        for conn in self.readers:
+            conn.close()
+        self.writer.close()
+
+
+def insert_rows(conn, table, rows, verb="INSERT"):
+    """executemany one parameterised INSERT over a frame in food_wastage.db columns"""
+    rows = rows.astype(object).where(rows.notna(), None)
+    columns = ", ".join(rows.columns)
+    sql = f"{verb} INTO {table} ({columns}) VALUES ({', '.join('?' * len(rows.columns))})"
+    conn.executemany(sql, rows.itertuples(index=False, name=None))
+    return len(rows)
+
+
+class FoodDatabase:
+    """Reads and writes of food_wastage.db through a ConnectionPool.
+
+    With an ``events`` writer (see events.EventWriter), claim creation and
+    status changes are also recorded as analytics events and notifications.
+    """
+
+    def __init__(self, path=DATABASE, readers=4, pool=None, events=None):
+        self.pool = pool or ConnectionPool(path, readers)
+        self.events = events
+
+    def query(self, sql, params=()):
+        """A SELECT as a DataFrame, on a pooled reader"""
+        with self.pool.read() as conn:
+            return pd.read_sql_query(sql, conn, params=tuple(params))
+
+    def rows(self, sql, params=()):
+        """A SELECT as a list of tuples (no DataFrame), on a pooled reader"""
+        with self.pool.read() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def insert_listings(self, listings):
+        """Append CSV-shaped listings (see database.DB_SCHEMA) in one transaction; returns the row count"""
+        table, rows = to_db_frame("listings", listings)
+        with self.pool.write() as conn:
+            return insert_rows(conn, table, rows)
+
+    def insert_claims(self, claims):
+        """Append CSV-shaped claims in one transaction; returns the row count"""
+        table, rows = to_db_frame("claims", claims)
+        if "Quantity_Claimed" in claims:
+            rows["quantity_claimed"] = claims["Quantity_Claimed"].to_numpy()
+        with self.pool.write() as conn:
+            return insert_rows(conn, table, rows)
+
+    def add_claim(self, food_id, receiver_id, quantity, status="pending", timestamp=None):
+        """Record one claim; returns its id"""
+        with self.pool.write() as conn:
+            claim_id = conn.execute(INSERT_CLAIM_SQL, (food_id, receiver_id, quantity, status, timestamp)).lastrowid
+        if self.events is not None:
+            self.events.record("claim_created", {
+                "claim_id": claim_id, "food_id": food_id, "receiver_id": receiver_id, "quantity": quantity,
+                "status": status,
+            })
+            self.events.notify_claim(claim_id, "Claim received", f"Your claim #{claim_id} for listing #{food_id} is {status}.")
+        return claim_id
+
+    def set_claim_status(self, claim_id, status):
+        with self.pool.write() as conn:
+            updated = conn.execute(UPDATE_CLAIM_STATUS_SQL, (status, status, status, claim_id)).rowcount
+        if updated and self.events is not None:
+            self.events.record("claim_status_changed", {"claim_id": claim_id, "status": status})
+            self.events.notify_claim(claim_id, "Claim updated", f"Your claim #{claim_id} is now {status}.")
+        return updated
+
+    def close(self):
+        self.pool.close()
+
+
+# =========================
+# Benchmark
+# =========================
+# A dashboard-sized read: claims per receiver type and status over a date range
+READ_SQL = """
+SELECT r.type, c.status, COUNT(*) AS claims, SUM(c.quantity_claimed) AS quantity
+FROM claims c JOIN receivers r ON r.id = c.receiver_id
+WHERE c.claim_timestamp >= ? AND c.claim_timestamp < ?
+GROUP BY r.type, c.status
+"""
+
+
+def _bench_copy(source, scale, directory):
+    """Schema of ``source`` filled with synthetic data of ``scale``, in ``directory``"""
+    from food_wastage_app.migrations import migrate, populate
+
+    path = os.path.join(directory, "bench.db")
+    src, conn = sqlite3.connect(f"file:{source}?mode=ro", uri=True), sqlite3.connect(path)
+    for (sql,) in src.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"):
+        conn.execute(sql)
+    src.close()
+    populate(conn, scale)
+    migrate(conn)
+    conn.close()
+    return path
+
+
+def run_mixed(path, journal_mode, readers, seconds, batch=50):
+    """Readers run an aggregate over claims while one thread writes claims and status
+    changes; returns (read latencies ms, write transaction latencies ms, claims written)"""
+    db = FoodDatabase(pool=ConnectionPool(path, readers, journal_mode=journal_mode))
+    food_ids = db.query("SELECT id FROM food_listings")["id"].to_numpy()
+    receiver_ids = db.query("SELECT id FROM receivers")["id"].to_numpy()
+    stop = threading.Event()
+    latencies, write_latencies, written = [], [], [0]
+
+    def reader():
+        mine = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            db.rows(READ_SQL, ("2025-03-01", "2025-04-01"))
+            mine.append(time.perf_counter() - start)
+        latencies.extend(mine)
+
+    def writer():
+        rng = np.random.default_rng(0)
+        while not stop.is_set():
+            claims = pd.DataFrame({
+                "Claim_ID": None, "Food_ID": rng.choice(food_ids, batch), "Receiver_ID": rng.choice(receiver_ids, batch),
+                "Status": "Pending", "Timestamp": pd.Timestamp.now(), "Quantity_Claimed": rng.integers(1, 20, batch),
+            })
+            for write in [
+                lambda: db.insert_claims(claims),
+                lambda: db.set_claim_status(db.add_claim(int(claims["Food_ID"].iloc[0]), 1, 5), "completed"),
+            ]:
+                start = time.perf_counter()
+                write()
+                write_latencies.append(time.perf_counter() - start)
+            written[0] += batch + 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + [threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    db.close()
+    return np.array(latencies) * 1000, np.array(write_latencies) * 1000, written[0]
+
+
+def bench(source, scale, readers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        seed = _bench_copy(source, scale, tmp)
+        for journal_mode in ["delete", "wal"]:
+            path = os.path.join(tmp, f"{journal_mode}.db")
+            shutil.copy(seed, path)
+            reads, writes, written = run_mixed(path, journal_mode, readers, seconds)
+            print(f"{journal_mode:<6} {readers} readers: {len(reads) / seconds:7,.0f} reads/s, "
+                  f"p50 {np.percentile(reads, 50):6.2f} ms, p99 {np.percentile(reads, 99):6.2f} ms | "
+                  f"writer: {written / seconds:7,.0f} claims/s, p50 {np.percentile(writes, 50):6.2f} ms, "
+                  f"p99 {np.percentile(writes, 99):6.2f} ms, max {writes.max():7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DATABASE)
+    parser.add_argument("--status", action="store_true", help="switch --db to WAL and print claims by status")
+    parser.add_argument("--bench", action="store_true", help="run on a synthetic copy of --db's schema")
+    parser.add_argument("--scale", type=int, default=20, help="with --bench: synthetic data scale")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.db, args.scale, args.readers, args.seconds)
+        return
+    if not args.status:
+        parser.error("nothing to do: pass --status or --bench")
+    db = FoodDatabase(args.db, args.readers)
+    print(f"{args.db}: journal_mode {db.pool.journal_mode}")
+    print(db.query(CLAIMS_BY_STATUS_SQL).to_string(index=False))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
-import pandas as pd
+import argparse
+import io
 import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from food_wastage_app.snapshots import read_table
 
 # Use correct filenames
 providers_file = "providers.csv"
@@ -7,9 +14,11 @@ receivers_file = "receivers.csv"
 food_listings_file = "listings.csv"
 claims_file = "claims.csv"   # if you also have claims data
 
-def load_csv(file_path):
-    """Generic CSV loader with clean column names"""
-    df = pd.read_csv(file_path)
+DATABASE = "food_wastage.db"
+
+def load_csv(file_path, columns=None):
+    """Generic CSV loader with clean column names (served from the Parquet snapshot when fresh)"""
+    df = read_table(file_path, columns=columns)
     df.columns = df.columns.str.strip().str.lower()
     return df
 
@@ -28,3 +37,254 @@ def get_food_listings():
 def get_claims():
     """Load claims data"""
     return load_csv(claims_file)
+
+# food_wastage.db table and CSV -> column mapping for each source table
+DB_SCHEMA = {
+    "providers": ("providers", {
+        "Provider_ID": "id", "Name": "name", "Type": "type",
+        "Address": "address", "City": "city", "Contact": "contact",
+    }),
+    "receivers": ("receivers", {
+        "Receiver_ID": "id", "Name": "name", "Type": "type",
+        "City": "city", "Contact": "contact",
+    }),
+    "listings": ("food_listings", {
+        "Food_ID": "id", "Food_Name": "food_name", "Quantity": "quantity",
+        "Expiry_Date": "expiry_date", "Provider_ID": "provider_id", "Location": "city",
+        "Food_Type": "food_type", "Meal_Type": "meal_type",
+    }),
+    "claims": ("claims", {
+        "Claim_ID": "id", "Food_ID": "food_id", "Receiver_ID": "receiver_id",
+        "Status": "status", "Timestamp": "claim_timestamp",
+    }),
+}
+
+def to_db_frame(name, df):
+    """Convert a CSV-shaped table into (db table name, rows in food_wastage.db columns)"""
+    table, columns = DB_SCHEMA[name]
+    # Accept raw CSV headers as well as the normalised (strip/lower) ones
+    columns = {col.lower(): db_col for col, db_col in columns.items()}
+    out = df.rename(columns=lambda col: col.strip().lower())[list(columns)].rename(columns=columns)
+    for col in out.columns:
+        if isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype(object)
+    if "expiry_date" in out:
+        out["expiry_date"] = pd.to_datetime(out["expiry_date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    if "claim_timestamp" in out:
+        out["claim_timestamp"] = pd.to_datetime(out["claim_timestamp"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
+    if name == "claims":
+        out["status"] = out["status"].str.lower()
+        # The CSV export carries no claimed quantity
+        out["quantity_claimed"] = 0
+    return table, out
+
+
+# =========================
+# Streaming ingestion
+# =========================
+# Large exports are read in chunks, cleaned and written chunk by chunk, so
+# memory stays bounded by the chunk size rather than the file size.
+INGEST_DIR = "ingested"
+
+# Rows missing any of these (after cleaning) are rejected; they are the
+# NOT NULL columns of the matching food_wastage.db table
+REQUIRED_COLUMNS = {
+    "providers": ["provider_id", "name", "type", "address", "city", "contact"],
+    "receivers": ["receiver_id", "name", "type", "city", "contact"],
+    "listings": ["food_id", "food_name", "quantity", "expiry_date", "provider_id", "location", "food_type", "meal_type"],
+    "claims": ["claim_id", "food_id", "receiver_id", "status"],
+}
+INTEGER_COLUMNS = ["provider_id", "receiver_id", "food_id", "claim_id"]
+DATE_COLUMNS = ["expiry_date", "timestamp"]
+
+# In-memory size of a chunk relative to its DataFrame: cleaning and the
+# database conversion each hold a copy while the chunk is being written
+CHUNK_OVERHEAD = 4
+MIN_CHUNK_ROWS = 1_000
+# Bytes of the file parsed up front to size the first chunk
+PROBE_BYTES = 64 * 2**10
+
+
+def clean_contact(contact):
+    """Keep only digits and '+' in contact numbers"""
+    return contact.astype("string").str.replace(r"[^0-9+]", "", regex=True)
+
+
+def clean_chunk(name, df):
+    """Normalise, clean, validate and type-cast one chunk; returns (clean rows, rejected count)"""
+    df = df.rename(columns=lambda col: col.strip().lower())
+    missing = set(REQUIRED_COLUMNS[name]) - set(df.columns)
+    if missing:
+        raise ValueError(f"{name}: missing column(s) {', '.join(sorted(missing))}")
+    for col in df.columns:
+        df[col] = df[col].str.strip()
+    if "contact" in df:
+        df["contact"] = clean_contact(df["contact"])
+    if "address" in df:
+        df["address"] = df["address"].str.replace("\n", " ", regex=False).str.strip()
+    for col in df.columns:
+        # Blank after cleaning counts as missing
+        df[col] = df[col].mask(df[col] == "")
+    if "quantity" in df:
+        df["quantity"] = pd.to_numeric(df["quantity"], errors="coerce").fillna(0)
+    for col in INTEGER_COLUMNS:
+        if col in df:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in DATE_COLUMNS:
+        if col in df:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    valid = df[REQUIRED_COLUMNS[name]].notna().all(axis=1)
+    df = df[valid].astype({col: "int64" for col in INTEGER_COLUMNS if col in df})
+    return df.reset_index(drop=True), int((~valid).sum())
+
+
+class SqliteSink:
+    """Upserts cleaned chunks into the food_wastage.db tables, one transaction per chunk.
+
+    An existing row only has the columns the CSV carries overwritten; those
+    the app maintains (claimed quantity, pickup times, coordinates, ...) keep
+    their values.
+    """
+
+    def __init__(self, path=DATABASE):
+        self.conn = sqlite3.connect(path)
+
+    def write(self, name, chunk):
+        table, rows = to_db_frame(name, chunk)
+        rows = rows.astype(object).where(rows.notna(), None)
+        columns = ", ".join(rows.columns)
+        updates = ", ".join(f"{col} = excluded.{col}" for col in DB_SCHEMA[name][1].values() if col != "id")
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES ({', '.join('?' * len(rows.columns))}) "
+                f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                rows.itertuples(index=False, name=None),
+            )
+
+    def close(self):
+        self.conn.close()
+
+    def discard(self):
+        # Chunks already written were committed one by one; only the connection is left to release
+        self.conn.close()
+
+
+class ParquetSink:
+    """Appends cleaned chunks to <out_dir>/<name>.parquet as row groups"""
+
+    def __init__(self, out_dir=INGEST_DIR):
+        self.out_dir = out_dir
+        self.writers = {}
+
+    def write(self, name, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if name not in self.writers:
+            os.makedirs(self.out_dir, exist_ok=True)
+            path = os.path.join(self.out_dir, name + ".parquet")
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            self.writers[name] = (pq.ParquetWriter(path + ".tmp", schema, compression="zstd"), path)
+        writer, _ = self.writers[name]
+        writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+
+    def close(self):
+        # Swap complete files into place only once every chunk is written
+        for writer, path in self.writers.values():
+            writer.close()
+            os.replace(path + ".tmp", path)
+        self.writers.clear()
+
+    def discard(self):
+        """Drop the partial files, leaving the published ones untouched"""
+        for writer, path in self.writers.values():
+            writer.close()
+            os.remove(path + ".tmp")
+        self.writers.clear()
+
+
+def print_progress(stats):
+    print(
+        f"{stats['table']}: {stats['rows_written']:,} rows written, {stats['rows_rejected']:,} rejected, "
+        f"{stats['fraction'] * 100:5.1f}% of file, chunk {stats['chunk_rows']:,} rows, {stats['seconds']:.1f}s"
+    )
+
+
+def probe_bytes_per_row(file_path, probe_bytes=PROBE_BYTES):
+    """In-memory bytes per row of the first rows of a CSV, parsed as ingest_csv parses them"""
+    with open(file_path, "rb") as f:
+        sample = f.read(probe_bytes)
+    sample = sample[:sample.rfind(b"\n") + 1] or sample
+    probe = pd.read_csv(io.BytesIO(sample), dtype=str)
+    # A header longer than the sample: one row is at least that big
+    return probe.memory_usage(deep=True).sum() / len(probe) if len(probe) else float(len(sample))
+
+
+def ingest_csv(file_path, name, sink, memory_limit_mb=256, progress=print_progress):
+    """Stream one CSV into ``sink`` in chunks sized to stay under ``memory_limit_mb``.
+
+    The first chunk is sized from a parse of the file's first rows; later
+    chunks from the largest bytes per row measured so far, so wide or
+    text-heavy files get smaller chunks.
+    """
+    budget = memory_limit_mb * 2**20
+    size = os.path.getsize(file_path) or 1
+    bytes_per_row = probe_bytes_per_row(file_path)
+    rows = max(MIN_CHUNK_ROWS, int(budget / (bytes_per_row * CHUNK_OVERHEAD)))
+    stats = {"table": name, "rows_read": 0, "rows_written": 0, "rows_rejected": 0,
+             "fraction": 0.0, "chunk_rows": rows, "seconds": 0.0}
+    start = time.perf_counter()
+    with open(file_path, "rb") as f, pd.read_csv(f, dtype=str, iterator=True) as reader:
+        while True:
+            try:
+                chunk = reader.get_chunk(rows)
+            except StopIteration:
+                break
+            bytes_per_row = max(bytes_per_row, chunk.memory_usage(deep=True).sum() / max(len(chunk), 1))
+            clean, rejected = clean_chunk(name, chunk)
+            if len(clean):
+                sink.write(name, clean)
+            stats.update(
+                rows_read=stats["rows_read"] + len(chunk),
+                rows_written=stats["rows_written"] + len(clean),
+                rows_rejected=stats["rows_rejected"] + rejected,
+                fraction=min(f.tell() / size, 1.0),
+                chunk_rows=len(chunk),
+                seconds=time.perf_counter() - start,
+            )
+            if progress:
+                progress(dict(stats))
+            rows = max(MIN_CHUNK_ROWS, int(budget / (bytes_per_row * CHUNK_OVERHEAD)))
+    return stats
+
+
+def ingest_files(files, sink, memory_limit_mb=256, progress=print_progress):
+    """Stream {table name: csv path} into ``sink``; it is closed only if every file ingests, else discarded"""
+    try:
+        stats = [ingest_csv(path, name, sink, memory_limit_mb, progress=progress) for name, path in files.items()]
+    except BaseException:
+        sink.discard()
+        raise
+    sink.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream CSV exports into the local database or Parquet")
+    parser.add_argument("files", nargs="+", metavar="TABLE=CSV", help="e.g. claims=exports/claims.csv")
+    parser.add_argument("--to", choices=["db", "parquet"], default="db")
+    parser.add_argument("--db", default=DATABASE)
+    parser.add_argument("--out-dir", default=INGEST_DIR)
+    parser.add_argument("--memory-mb", type=int, default=256)
+    args = parser.parse_args()
+
+    files = dict(spec.split("=", 1) for spec in args.files)
+    unknown = set(files) - set(DB_SCHEMA)
+    if unknown:
+        parser.error(f"unknown table(s): {', '.join(sorted(unknown))}; expected {', '.join(DB_SCHEMA)}")
+    sink = SqliteSink(args.db) if args.to == "db" else ParquetSink(args.out_dir)
+    ingest_files(files, sink, args.memory_mb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Per-query stage timings, row counts and memory of the dashboard views.
+
+    python -m food_wastage_app.diagnostics              # per-query summary of the query log
+    python -m food_wastage_app.diagnostics --last 20    # the 20 most recent traces, stage by stage
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+QUERY_LOG = os.path.join("snapshots", "query_log.jsonl")
+# Past this size the log is moved to query_log.jsonl.1 (replacing the previous one) and restarted
+QUERY_LOG_MAX_BYTES = 4 * 2**20
+
+_log_lock = threading.Lock()
+
+
+def rss_mb():
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return peak_rss_mb()  # no /proc (macOS): the high-water mark is the best we have
+
+
+def peak_rss_mb():
+    """High-water mark of the resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # bytes on macOS, KiB elsewhere
+
+
+def _rows(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return sum(len(item) for item in value)
+    return len(value)
+
+
+class QueryTrace:
+    """Stages of one view execution: seconds, rows in/out and RSS after each"""
+
+    def __init__(self, query, filters=None, log_path=QUERY_LOG, max_log_bytes=QUERY_LOG_MAX_BYTES):
+        self.query = query
+        self.filters = filters
+        self.log_path = log_path
+        self.max_log_bytes = max_log_bytes
+        self.stages = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Time the block; set ``record["rows_out"]`` (a frame, list of frames or count) inside it"""
+        record = {"stage": name, "rows_in": _rows(rows_in), "rows_out": None}
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            rows_out = record["rows_out"]
+            record["rows_out"] = rows_out if rows_out is None or isinstance(rows_out, int) else _rows(rows_out)
+            record["rss_mb"] = rss_mb()
+            record["rss_delta_mb"] = record["rss_mb"] - rss_before
+            record["peak_rss_mb"] = max(peak_rss_mb(), record["rss_mb"])
+            self.stages.append(record)
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def frame(self):
+        columns = ["stage", "seconds", "rows_in", "rows_out", "rss_mb", "rss_delta_mb", "peak_rss_mb"]
+        return pd.DataFrame(self.stages, columns=columns).astype({"rows_in": "Int64", "rows_out": "Int64"})
+
+    def finish(self):
+        """Append the trace to the query log, rotating it once it is too large"""
+        record = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"), "query": self.query,
+            "filters": repr(self.filters) if self.filters is not None else None,
+            "total_s": self.total(), "stages": self.stages,
+        }
+        if self.log_path:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with _log_lock:
+                with open(self.log_path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+                    size = f.tell()
+                if size >= self.max_log_bytes:
+                    os.replace(self.log_path, self.log_path + ".1")
+        return record
+
+
+def _tail_lines(path, limit, block=2**16):
+    """The last ``limit`` lines of a file, read backwards from its end"""
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b""
+        # One newline more than needed, so the first (possibly partial) line can be dropped
+        while position > 0 and data.count(b"\n") <= limit:
+            step = min(block, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.splitlines()
+    return (lines[1:] if position > 0 else lines)[-limit:]
+
+
+def read_log(log_path=QUERY_LOG, limit=None):
+    """Traces from the query log and its rotated predecessor, oldest first; with
+    ``limit`` only the most recent ones, without reading the rest of the files"""
+    lines = []
+    for path in [log_path, log_path + ".1"]:
+        if not os.path.exists(path):
+            continue
+        if limit:
+            lines = _tail_lines(path, limit - len(lines)) + lines
+            if len(lines) >= limit:
+                break
+        else:
+            with open(path, "rb") as f:
+                lines = f.read().splitlines() + lines
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def summarize(records):
+    """Per query: runs, median/p95/max total seconds, slowest stage and peak RSS, slowest first"""
+    rows = []
+    for record in records:
+        slowest = max(record["stages"], key=lambda stage: stage["seconds"], default=None)
+        rows.append({
+            "query": record["query"], "total_s": record["total_s"],
+            "slowest_stage": slowest["stage"] if slowest else None,
+            "peak_rss_mb": max((stage["peak_rss_mb"] for stage in record["stages"]), default=None),
+        })
+    if not rows:
+        return pd.DataFrame(columns=["query", "runs", "median_s", "p95_s", "max_s", "slowest_stage", "peak_rss_mb"])
+    df = pd.DataFrame(rows)
+    grouped = df.groupby("query", sort=False)
+    summary = grouped["total_s"].agg(
+        runs="count", median_s="median", p95_s=lambda s: s.quantile(0.95), max_s="max"
+    )
+    summary["slowest_stage"] = grouped["slowest_stage"].agg(lambda s: s.mode().iloc[0])
+    summary["peak_rss_mb"] = grouped["peak_rss_mb"].max()
+    return summary.reset_index().sort_values("p95_s", ascending=False, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=QUERY_LOG)
+    parser.add_argument("--last", type=int, help="print the most recent traces instead of the summary")
+    args = parser.parse_args()
+
+    if args.last:
+        for record in read_log(args.log, args.last):
+            print(f"{record['time']} {record['query']} {record['total_s'] * 1000:.1f} ms")
+            for stage in record["stages"]:
+                print(f"    {stage['stage']:<12} {stage['seconds'] * 1000:8.1f} ms"
+                      f"  rows {stage['rows_in']} -> {stage['rows_out']}  rss {stage['rss_mb']:.0f} MB")
+    else:
+        print(summarize(read_log(args.log)).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
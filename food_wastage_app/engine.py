@@ -0,0 +1,228 @@
+import re
+import sqlite3
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from food_wastage_app.database import get_claims, get_food_listings, get_providers, get_receivers
+from food_wastage_app.queries import queries
+
+try:
+    import duckdb
+except ImportError:  # optional backend
+    duckdb = None
+
+# Table names used by queries.py and the loaders that feed them.
+# listings.csv has no listing timestamp, so Q18 and Q25 only run against a database.
+TABLE_LOADERS = {
+    "providers_data": get_providers,
+    "receivers_data": get_receivers,
+    "food_listings_data": get_food_listings,
+    "claims_data": get_claims,
+}
+
+# Views exposing the app schema of food_wastage.db under the names queries.py expects
+DATABASE_VIEWS = {
+    "providers_data": """
+        SELECT id AS provider_id, name, type, address, city, contact
+        FROM providers
+    """,
+    "receivers_data": """
+        SELECT id AS receiver_id, name, type, city, contact
+        FROM receivers
+    """,
+    "food_listings_data": """
+        SELECT f.id AS food_id, f.food_name, f.quantity, f.expiry_date, f.provider_id,
+               (SELECT p.type FROM providers p WHERE p.id = f.provider_id) AS provider_type,
+               f.city AS location, f.food_type, f.meal_type,
+               f.created_at AS listing_date, f.created_at AS "timestamp"
+        FROM food_listings f
+    """,
+    "claims_data": """
+        SELECT id AS claim_id, food_id, receiver_id, status, claim_timestamp AS "timestamp"
+        FROM claims
+    """,
+}
+
+WEEKDAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def load_tables():
+    """Load the four source tables with lower-case column names"""
+    return {name: loader() for name, loader in TABLE_LOADERS.items()}
+
+
+# =========================
+# Dialect translation
+# =========================
+def _split_args(args):
+    """Split a function argument list on top-level commas"""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(args):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(args[start:i].strip())
+            start = i + 1
+    parts.append(args[start:].strip())
+    return parts
+
+
+def _rewrite_calls(sql, name, rewrite):
+    """Replace every ``name(...)`` call with ``rewrite(args_string)``"""
+    pattern = re.compile(r"\b" + name + r"\s*\(", re.IGNORECASE)
+    match = pattern.search(sql)
+    while match:
+        depth, end = 1, match.end()
+        while depth:
+            if sql[end] == "(":
+                depth += 1
+            elif sql[end] == ")":
+                depth -= 1
+            end += 1
+        replacement = rewrite(sql[match.end():end - 1])
+        sql = sql[:match.start()] + replacement + sql[end:]
+        match = pattern.search(sql, match.start() + len(replacement))
+    return sql
+
+
+def _sqlite_date_trunc(args):
+    unit, expr = _split_args(args)
+    formats = {"year": "%Y-01-01", "month": "%Y-%m-01", "day": "%Y-%m-%d"}
+    return f"strftime('{formats[unit.strip(chr(39)).lower()]}', {expr})"
+
+
+def _sqlite_to_char(args):
+    expr, fmt = _split_args(args)
+    if fmt.strip("'").lower() != "day":
+        raise ValueError(f"Unsupported TO_CHAR format: {fmt}")
+    cases = " ".join(f"WHEN '{i}' THEN '{day}'" for i, day in enumerate(WEEKDAYS))
+    return f"(CASE strftime('%w', {expr}) {cases} END)"
+
+
+def _sqlite_extract(args):
+    field, expr = re.split(r"\s+FROM\s+", args, maxsplit=1, flags=re.IGNORECASE)
+    if field.strip().lower() != "epoch":
+        raise ValueError(f"Unsupported EXTRACT field: {field}")
+    expr = expr.strip()
+    if expr.startswith("(") and expr.endswith(")"):
+        expr = expr[1:-1]
+    left, right = expr.split(" - ", 1)
+    return f"((julianday({left.strip()}) - julianday({right.strip()})) * 86400)"
+
+
+def to_sqlite(sql):
+    """Translate the PostgreSQL used in queries.py into SQLite"""
+    sql = re.sub(r"::\s*(timestamp|date)\b", "", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"::\s*decimal\b", " * 1.0", sql, flags=re.IGNORECASE)
+    sql = _rewrite_calls(sql, "DATE_TRUNC", _sqlite_date_trunc)
+    sql = _rewrite_calls(sql, "TO_CHAR", _sqlite_to_char)
+    sql = _rewrite_calls(sql, "EXTRACT", _sqlite_extract)
+    return sql.replace("%s", "?")
+
+
+def to_duckdb(sql):
+    """Translate the PostgreSQL used in queries.py into DuckDB (mostly compatible)"""
+    sql = _rewrite_calls(
+        sql, "TO_CHAR",
+        lambda args: "strftime({}, '%A')".format(_split_args(args)[0]),
+    )
+    return sql.replace("%s", "?")
+
+
+# =========================
+# Engines
+# =========================
+class QueryEngine(ABC):
+    """Runs queries.py SQL against an embedded backend and returns DataFrames"""
+
+    @abstractmethod
+    def translate(self, sql):
+        """queries.py SQL in the backend's dialect"""
+
+    @abstractmethod
+    def execute(self, sql, params=()):
+        """Run queries.py SQL (translated here) and return a DataFrame"""
+
+    def run(self, query_id, params=()):
+        """Run one entry of the ``queries`` dict"""
+        return self.execute(queries[query_id]["query"], params)
+
+    def run_all(self, params=None):
+        """Run every query; failures are returned as the exception instead of a frame"""
+        params = params or {}
+        results = {}
+        for query_id in queries:
+            try:
+                results[query_id] = self.run(query_id, params.get(query_id, ()))
+            except Exception as exc:
+                results[query_id] = exc
+        return results
+
+
+class SQLiteEngine(QueryEngine):
+    def __init__(self, conn):
+        self.conn = conn
+
+    @classmethod
+    def from_tables(cls, tables=None, path=":memory:"):
+        """Load DataFrames (default: the CSV sources) into a SQLite database"""
+        tables = load_tables() if tables is None else tables
+        conn = sqlite3.connect(path, check_same_thread=False)
+        for name, df in tables.items():
+            df.to_sql(name, conn, if_exists="replace", index=False)
+        return cls(conn)
+
+    @classmethod
+    def from_database(cls, path="food_wastage.db", readonly=False):
+        """Attach to an app database such as food_wastage.db through compatibility views"""
+        if readonly:
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(path, check_same_thread=False)
+        for name, select in DATABASE_VIEWS.items():
+            conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS {name} AS {select}")
+        return cls(conn)
+
+    def translate(self, sql):
+        return to_sqlite(sql)
+
+    def execute(self, sql, params=()):
+        return pd.read_sql_query(self.translate(sql), self.conn, params=tuple(params))
+
+
+class DuckDBEngine(QueryEngine):
+    def __init__(self, conn):
+        self.conn = conn
+
+    @classmethod
+    def from_tables(cls, tables=None, path=":memory:"):
+        """Register DataFrames (default: the CSV sources) with DuckDB without copying"""
+        if duckdb is None:
+            raise ImportError("DuckDBEngine requires the 'duckdb' package")
+        tables = load_tables() if tables is None else tables
+        conn = duckdb.connect(path)
+        for name, df in tables.items():
+            conn.register(name, df)
+        return cls(conn)
+
+    def translate(self, sql):
+        return to_duckdb(sql)
+
+    def execute(self, sql, params=()):
+        return self.conn.execute(self.translate(sql), list(params)).df()
+
+
+ENGINES = {"sqlite": SQLiteEngine, "duckdb": DuckDBEngine}
+
+
+def get_engine(backend="sqlite", database=None):
+    """Build an engine over the CSV sources, or over an existing SQLite database file"""
+    engine_cls = ENGINES[backend]
+    if database is not None:
+        if engine_cls is not SQLiteEngine:
+            raise ValueError("Only the sqlite backend can open a database file")
+        return engine_cls.from_database(database)
+    return engine_cls.from_tables()
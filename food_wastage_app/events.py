@@ -0,0 +1,278 @@
+"""Buffered writes of app events into the analytics and notifications tables.
+
+    python -m food_wastage_app.events --bench                   # record() latency and flush throughput
+    python -m food_wastage_app.events --bench --events 500000 --queue 1000
+    python -m food_wastage_app.events --db food_wastage.db --last 20
+
+The dashboard records its events only when FOODRESCUE_EVENTS_DB names an
+existing database (which the writer switches to WAL mode); the tracked
+food_wastage.db is never written just by viewing the dashboard.
+"""
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from food_wastage_app.dal import ConnectionPool
+from food_wastage_app.database import DATABASE
+
+EVENTS_DB_ENV = "FOODRESCUE_EVENTS_DB"
+
+# kind picks the INSERT_SQL statement, values are its parameters, at is the epoch time of the event
+Event = namedtuple("Event", ["kind", "values", "at"])
+
+INSERT_SQL = {
+    "analytics": "INSERT INTO analytics (event_type, event_data, user_id, timestamp) VALUES (?, ?, ?, ?)",
+    "notification": "INSERT INTO notifications (user_id, title, message, type, created_at) VALUES (?, ?, ?, ?, ?)",
+    # Addressed to the user behind the claim's receiver, looked up when the batch is written
+    "claim_notification": """
+        INSERT INTO notifications (user_id, title, message, type, created_at)
+        SELECT r.user_id, ?, ?, ?, ? FROM claims c JOIN receivers r ON r.id = c.receiver_id
+        WHERE c.id = ? AND r.user_id IS NOT NULL
+    """,
+}
+
+_STOP = object()
+
+
+def _timestamp(seconds):
+    """Epoch seconds in the format of SQLite's CURRENT_TIMESTAMP (UTC)"""
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _row(event):
+    kind, values, at = event
+    if kind == "analytics":
+        event_type, data, user_id = values
+        return event_type, None if data is None else json.dumps(data, default=str), user_id, _timestamp(at)
+    if kind == "notification":
+        return (*values, _timestamp(at))
+    title, message, type_, claim_id = values
+    return title, message, type_, _timestamp(at), claim_id
+
+
+class EventWriter:
+    """Events queued in memory and written to SQLite in batches, off the request path.
+
+    An asyncio loop on a background thread owns a bounded queue. ``record``
+    and ``notify`` only hand the event to that loop and return; when the
+    queue is full the event is dropped and counted rather than making the
+    caller wait. Coroutines that can afford to wait use ``emit``, which
+    blocks until there is room. The loop writes a batch once
+    ``batch_size`` events are waiting or ``flush_interval`` seconds after
+    the first one arrived, one transaction per batch, on an executor
+    thread so the queue keeps filling while SQLite writes. Events that are
+    still buffered are written on ``close`` (also registered at exit).
+    """
+
+    def __init__(self, path=DATABASE, max_queue=10_000, batch_size=500, flush_interval=1.0, pool=None):
+        self.pool = pool or ConnectionPool(path, readers=0)
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = {"recorded": 0, "dropped": 0, "written": 0, "failed": 0, "batches": 0}
+        self.closed = False
+        # Events handed to the loop but not yet in the queue: call_soon_threadsafe
+        # itself is unbounded, so the bound is checked before handing over
+        self.pending = 0
+        self.pending_lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), name="event-writer", daemon=True)
+        self.thread.start()
+        ready.wait()
+        atexit.register(self.close)
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.queue = asyncio.Queue(self.max_queue)
+        self.flusher = self.loop.create_task(self._flush_loop())
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+
+    # ---- producers (any thread) ----
+    def _offer(self, event):
+        with self.pending_lock:
+            full = self.closed or self.pending + self.queue.qsize() >= self.max_queue
+            if full:
+                self.stats["dropped"] += 1
+            else:
+                self.pending += 1
+        if not full:
+            self.loop.call_soon_threadsafe(self._enqueue, event)
+
+    def _enqueue(self, event):
+        with self.pending_lock:
+            self.pending -= 1
+        try:
+            self.queue.put_nowait(event)
+            self.stats["recorded"] += 1
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+
+    def record(self, event_type, data=None, user_id=None):
+        """Queue an analytics row; ``data`` is stored as JSON and must not change after the call"""
+        self._offer(Event("analytics", (event_type, data, user_id), time.time()))
+
+    def notify(self, user_id, title, message, type="info"):
+        self._offer(Event("notification", (user_id, title, message, type), time.time()))
+
+    def notify_claim(self, claim_id, title, message, type="info"):
+        """Notify the user behind a claim's receiver (nothing when the receiver has no user)"""
+        self._offer(Event("claim_notification", (title, message, type, claim_id), time.time()))
+
+    async def emit(self, event_type, data=None, user_id=None):
+        """``record`` for coroutines on any loop: waits for room instead of dropping"""
+        event = Event("analytics", (event_type, data, user_id), time.time())
+        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._put(event), self.loop))
+
+    async def _put(self, event):
+        await self.queue.put(event)
+        self.stats["recorded"] += 1
+
+    # ---- the writer loop ----
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            event = await self.queue.get()
+            if event is _STOP:
+                break
+            batch = [event]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    event = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        event = await asyncio.wait_for(self.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if event is _STOP:
+                    stopping = True
+                    break
+                batch.append(event)
+            try:
+                await loop.run_in_executor(None, self._write, batch)
+            except RuntimeError:
+                # Closing at interpreter exit, after the executors shut down: write from this thread
+                self._write(batch)
+
+    def _write(self, batch):
+        rows = {}
+        for event in batch:
+            rows.setdefault(event.kind, []).append(_row(event))
+        try:
+            with self.pool.write() as conn:
+                for kind, values in rows.items():
+                    conn.executemany(INSERT_SQL[kind], values)
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+        except Exception as exc:
+            # Instrumentation never takes the app down (nor this loop): count the loss and carry on
+            self.stats["failed"] += len(batch)
+            print(f"event writer: {len(batch)} events not written: {exc}", file=sys.stderr)
+
+    def metrics(self):
+        return dict(self.stats, queued=self.queue.qsize())
+
+    def close(self, timeout=30.0):
+        """Write everything still queued, then stop the loop"""
+        if self.closed:
+            return
+        self.closed = True
+
+        async def stop():
+            await self.queue.put(_STOP)
+            await self.flusher
+
+        try:
+            asyncio.run_coroutine_threadsafe(stop(), self.loop).result(timeout)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout)
+            self.pool.close()
+            atexit.unregister(self.close)
+
+
+def from_environment():
+    """The dashboard's writer into FOODRESCUE_EVENTS_DB; None when it is unset, empty or missing"""
+    path = os.environ.get(EVENTS_DB_ENV)
+    return EventWriter(path) if path and os.path.exists(path) else None
+
+
+# =========================
+# Benchmark
+# =========================
+def bench(source, n_events, max_queue, batch_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.db")
+        shutil.copy(source, path)
+
+        writer = EventWriter(path, max_queue=max_queue, batch_size=batch_size)
+        latencies = np.empty(n_events)
+        start = time.perf_counter()
+        for i in range(n_events):
+            began = time.perf_counter()
+            writer.record("dashboard_query", {"view": f"Q{i % 40}", "seconds": 0.01})
+            latencies[i] = time.perf_counter() - began
+        produced = time.perf_counter() - start
+        writer.close()
+        total = time.perf_counter() - start
+        stats = writer.stats
+        latencies *= 1e6
+        print(f"record(): p50 {np.percentile(latencies, 50):.1f} us, p99 {np.percentile(latencies, 99):.1f} us, "
+              f"max {latencies.max():.0f} us; {n_events / produced:,.0f} events/s offered")
+        print(f"written {stats['written']:,} in {stats['batches']:,} batches, dropped {stats['dropped']:,}; "
+              f"{stats['written'] / total:,.0f} events/s to SQLite")
+
+        # The same events as one INSERT and commit each, in the caller's thread
+        conn = sqlite3.connect(path)
+        sample = min(n_events, 2000)
+        latencies = np.empty(sample)
+        for i in range(sample):
+            began = time.perf_counter()
+            with conn:
+                conn.execute(INSERT_SQL["analytics"], _row(Event("analytics", ("dashboard_query", {"i": i}, None), time.time())))
+            latencies[i] = time.perf_counter() - began
+        conn.close()
+        latencies *= 1e6
+        print(f"direct insert per event: p50 {np.percentile(latencies, 50):.1f} us, "
+              f"p99 {np.percentile(latencies, 99):.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DATABASE)
+    parser.add_argument("--bench", action="store_true", help="run against a copy of --db")
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--queue", type=int, default=10_000, help="queue bound")
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--last", type=int, default=20, help="print the most recent events")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.db, args.events, args.queue, args.batch)
+        return
+    with sqlite3.connect(f"file:{args.db}?mode=ro", uri=True) as conn:
+        events = pd.read_sql_query("SELECT * FROM analytics ORDER BY id DESC LIMIT ?", conn, params=(args.last,))
+    print(events.to_string(index=False) if len(events) else "no events recorded")
+
+
+if __name__ == "__main__":
+    main()
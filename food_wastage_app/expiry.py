@@ -0,0 +1,295 @@
+"""Open listings indexed by the hour they expire.
+
+    python -m food_wastage_app.expiry --now 2025-03-20 --hours 48               # listings.csv, every city
+    python -m food_wastage_app.expiry --now 2025-03-20 --hours 48 --city "New Carol"
+    python -m food_wastage_app.expiry --db food_wastage.db --hours 24
+    python -m food_wastage_app.expiry --bench --listings 1000000                # vs rescanning the table
+"""
+import argparse
+import heapq
+import sqlite3
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from food_wastage_app.schema import as_datetime
+
+# Rows of the near-expiry view
+EXPIRING_LIMIT = 50
+EXPIRING_COLUMNS = ["Food_ID", "Food_Name", "City", "Food_Type", "Quantity", "Expiry_Date"]
+
+# expires_at and expiry_date are nanoseconds since the epoch, so the index compares plain ints
+Listing = namedtuple("Listing", ["food_id", "city", "expires_at", "expiry_date", "food_name", "food_type", "quantity"])
+
+# A listing is good through its expiry date, or until the end of its pickup window when it has one
+OPEN_LISTINGS_SQL = """
+SELECT id AS Food_ID, food_name AS Food_Name, city AS City, food_type AS Food_Type, quantity AS Quantity,
+       expiry_date AS Expiry_Date,
+       CASE WHEN pickup_time_end IS NOT NULL THEN expiry_date || ' ' || pickup_time_end END AS Expires_At
+FROM food_listings
+WHERE status = 'available'
+"""
+
+
+def end_of_day(dates):
+    """The moment a listing dated ``dates`` stops being usable: midnight after it"""
+    return as_datetime(dates).dt.normalize() + pd.Timedelta(days=1)
+
+
+def nanoseconds(dates):
+    """datetime64 values as int64 nanoseconds since the epoch (NaT -> the smallest int64)"""
+    return dates.to_numpy().astype("datetime64[ns]").astype("int64")
+
+
+class ExpiryIndex:
+    """Open listings in hourly buckets, by city, keyed on when they expire.
+
+    A bucket number is whole hours since the epoch, so "expiring in the next
+    N hours" reads N buckets and never the rest of the table. A heap of the
+    bucket numbers in use lets ``expire`` drop everything past its time by
+    popping whole buckets: the cost is the expired listings, not the open
+    ones. A listing that is claimed or withdrawn is removed from its bucket
+    directly.
+    """
+
+    def __init__(self, bucket_hours=1):
+        self.bucket_ns = int(pd.Timedelta(hours=bucket_hours).value)
+        self.buckets = {}
+        self.order = []
+        self.where = {}
+
+    def __len__(self):
+        return len(self.where)
+
+    def _bucket(self, when):
+        return pd.Timestamp(when).value // self.bucket_ns
+
+    def add(self, listing):
+        """Index an open listing, replacing an earlier entry with the same food id"""
+        if listing.food_id in self.where:
+            self.remove(listing.food_id)
+        bucket = listing.expires_at // self.bucket_ns
+        cities = self.buckets.get(bucket)
+        if cities is None:
+            cities = self.buckets[bucket] = {}
+            heapq.heappush(self.order, bucket)
+        cities.setdefault(listing.city, {})[listing.food_id] = listing
+        self.where[listing.food_id] = (bucket, listing.city)
+
+    def remove(self, food_id):
+        """Drop a claimed or withdrawn listing; returns it, or None when it is not indexed"""
+        found = self.where.pop(food_id, None)
+        if found is None:
+            return None
+        bucket, city = found
+        cities = self.buckets[bucket]
+        listing = cities[city].pop(food_id)
+        if not cities[city]:
+            del cities[city]
+        if not cities:
+            # Its number stays in the heap until expire() passes it
+            del self.buckets[bucket]
+        return listing
+
+    @classmethod
+    def from_frame(cls, df, bucket_hours=1):
+        """Index a frame with Food_ID, Food_Name, City, Food_Type, Quantity and Expiry_Date
+        (plus an optional Expires_At); rows without a date never expire and are left out"""
+        index = cls(bucket_hours)
+        expiry_date = as_datetime(df["Expiry_Date"])
+        expires_at = end_of_day(expiry_date)
+        if "Expires_At" in df:
+            expires_at = as_datetime(df["Expires_At"]).fillna(expires_at)
+        keep = expires_at.notna().to_numpy()
+        columns = [
+            df["Food_ID"], df["City"].astype(object), nanoseconds(expires_at), nanoseconds(expiry_date),
+            df["Food_Name"].astype(object), df["Food_Type"].astype(object), df["Quantity"],
+        ]
+        for row in zip(*(np.asarray(col, dtype=object)[keep].tolist() for col in columns)):
+            index.add(Listing(*row))
+        return index
+
+    @classmethod
+    def from_listing_facts(cls, listing_facts, bucket_hours=1):
+        """The listings nobody has claimed yet, with their provider's city"""
+        return cls.from_frame(listing_facts[listing_facts["ClaimCount"].eq(0)], bucket_hours)
+
+    @classmethod
+    def from_database(cls, conn, bucket_hours=1):
+        return cls.from_frame(pd.read_sql_query(OPEN_LISTINGS_SQL, conn), bucket_hours)
+
+    def _bucket_numbers(self, first, last):
+        """Bucket numbers in use in [first, last]; either end open when None"""
+        if first is None or last is None or last - first + 1 > len(self.buckets):
+            # A wide (or open) range: walk the buckets that exist instead of every hour in it
+            return sorted(
+                bucket for bucket in self.buckets
+                if (first is None or bucket >= first) and (last is None or bucket <= last)
+            )
+        return [bucket for bucket in range(first, last + 1) if bucket in self.buckets]
+
+    def between(self, start=None, end=None, cities=None, limit=None):
+        """Listings expiring in [start, end) (either end open when None), soonest first.
+
+        ``cities`` narrows to those cities; ``limit`` stops after that many.
+        """
+        start = None if start is None else pd.Timestamp(start).value
+        end = None if end is None else pd.Timestamp(end).value
+        first = None if start is None else start // self.bucket_ns
+        last = None if end is None else (end - 1) // self.bucket_ns
+        found = []
+        for bucket in self._bucket_numbers(first, last):
+            by_city = self.buckets[bucket]
+            groups = by_city.values() if cities is None else (by_city[city] for city in cities if city in by_city)
+            rows = [
+                listing for group in groups for listing in group.values()
+                # Only the two edge buckets can hold listings outside the range
+                if (start is None or listing.expires_at >= start) and (end is None or listing.expires_at < end)
+            ]
+            rows.sort(key=lambda listing: (listing.expires_at, listing.food_id))
+            found.extend(rows)
+            if limit is not None and len(found) >= limit:
+                return found[:limit]
+        return found
+
+    def expiring(self, now, hours, city=None):
+        """Listings expiring within ``hours`` of ``now`` (in ``city`` when given), soonest first"""
+        now = pd.Timestamp(now)
+        return self.between(now, now + pd.Timedelta(hours=hours), None if city is None else [city])
+
+    def expire(self, now):
+        """Remove and return every listing whose bucket ended by ``now``.
+
+        Expiry is bucket-grained: a listing due within the current bucket
+        stays until the bucket has passed (``between`` still checks the exact time).
+        """
+        current = self._bucket(now)
+        expired = []
+        while self.order and self.order[0] < current:
+            cities = self.buckets.pop(heapq.heappop(self.order), None)
+            if cities is None:
+                continue  # emptied by remove()
+            for group in cities.values():
+                for food_id, listing in group.items():
+                    del self.where[food_id]
+                    expired.append(listing)
+        return expired
+
+    # ---- the near-expiry view, same table as analytics.expiring_soon ----
+    def supports(self, filters):
+        """Only the provider city is indexed, so type filters need the fact tables"""
+        return filters is None or not (filters.provider_types or filters.food_types)
+
+    def expiring_soon(self, filters=None, now=None):
+        now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+        start, end = filters._bounds() if filters is not None else (None, None)
+        # The range filters the expiry date; a listing expires at the end of that day.
+        # Nothing already expired is listed, whether or not expire() has dropped it yet
+        day = pd.Timedelta(days=1)
+        start = now if start is None else max(now, start + day)
+        rows = self.between(
+            start, None if end is None else end + day,
+            cities=filters.cities if filters is not None and filters.cities else None, limit=EXPIRING_LIMIT,
+        )
+        return frame(rows)
+
+
+def frame(listings):
+    """Listings as the rows of the near-expiry view"""
+    df = pd.DataFrame(
+        [(l.food_id, l.food_name, l.city, l.food_type, l.quantity, l.expiry_date) for l in listings],
+        columns=EXPIRING_COLUMNS,
+    )
+    df["Expiry_Date"] = pd.to_datetime(df["Expiry_Date"].astype("int64"), unit="ns")
+    return df
+
+
+# =========================
+# Benchmark
+# =========================
+def bench(n_listings, n_cities=200, days=60, hours=24, queries=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    cities = np.array([f"City {i}" for i in range(n_cities)])
+    start = pd.Timestamp("2025-01-01")
+    df = pd.DataFrame({
+        "Food_ID": np.arange(1, n_listings + 1),
+        "Food_Name": "Bread",
+        "City": cities[rng.integers(0, n_cities, n_listings)],
+        "Food_Type": "Vegan",
+        "Quantity": rng.integers(1, 51, n_listings),
+        "Expiry_Date": start + pd.to_timedelta(rng.integers(0, days, n_listings), unit="D"),
+        "Expires_At": start + pd.to_timedelta(rng.integers(0, days * 3600, n_listings), unit="s"),
+    })
+
+    began = time.perf_counter()
+    index = ExpiryIndex.from_frame(df)
+    print(f"index  {n_listings} listings in {time.perf_counter() - began:.2f}s")
+
+    # "Next N hours in city X" against a boolean mask over the whole frame
+    nows = start + pd.to_timedelta(rng.integers(0, days * 24, queries), unit="h")
+    picks = cities[rng.integers(0, n_cities, queries)]
+    expires_at, city_col = df["Expires_At"].to_numpy(), df["City"].to_numpy()
+    for name, run in [
+        ("index", lambda now, city: index.expiring(now, hours, city)),
+        ("scan", lambda now, city: df[(city_col == city) & (expires_at >= now.to_datetime64())
+                                      & (expires_at < (now + pd.Timedelta(hours=hours)).to_datetime64())]),
+    ]:
+        latencies = []
+        for now, city in zip(nows[:200] if name == "scan" else nows, picks):
+            began = time.perf_counter()
+            run(now, city)
+            latencies.append(time.perf_counter() - began)
+        latencies = np.array(latencies) * 1000
+        print(f"next {hours}h in a city, {name:<5} mean {latencies.mean():.3f} ms  p99 {np.percentile(latencies, 99):.3f} ms")
+    for now, city in zip(nows[:50], picks):
+        got = [listing.food_id for listing in index.expiring(now, hours, city)]
+        mask = (city_col == city) & (expires_at >= now.to_datetime64()) & (expires_at < (now + pd.Timedelta(hours=hours)).to_datetime64())
+        assert got == df[mask].sort_values(["Expires_At", "Food_ID"])["Food_ID"].tolist()
+
+    # A sweep every 10 minutes over the whole horizon: pop the expired buckets vs rescan the open listings
+    sweeps = [start + pd.Timedelta(minutes=minutes) for minutes in range(10, (days * 24 + 2) * 60, 10)]
+    began = time.perf_counter()
+    expired = sum(len(index.expire(now)) for now in sweeps)
+    wheel_s = time.perf_counter() - began
+    assert expired == n_listings and not len(index)
+    open_mask = np.ones(n_listings, dtype=bool)
+    began = time.perf_counter()
+    for now in sweeps:
+        gone = np.flatnonzero(open_mask & (expires_at < now.to_datetime64()))
+        open_mask[gone] = False
+    scan_s = time.perf_counter() - began
+    print(f"expire {len(sweeps)} sweeps: index {wheel_s / len(sweeps) * 1000:.2f} ms/sweep, "
+          f"rescan {scan_s / len(sweeps) * 1000:.2f} ms/sweep ({n_listings // len(sweeps)} expire per sweep)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--listings", type=int, default=1_000_000, help="with --bench: number of listings")
+    parser.add_argument("--now", help="reference time (default: now)")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--city")
+    parser.add_argument("--db", help="index the available listings of this database instead of listings.csv")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.listings)
+        return
+    if args.db:
+        with sqlite3.connect(f"file:{args.db}?mode=ro", uri=True) as conn:
+            index = ExpiryIndex.from_database(conn)
+    else:
+        from food_wastage_app.facts import load_dataset
+
+        data = load_dataset()
+        index = ExpiryIndex.from_listing_facts(data.listing_facts)
+    now = pd.Timestamp(args.now) if args.now else pd.Timestamp.now()
+    rows = index.expiring(now, args.hours, args.city)
+    print(frame(rows).to_string(index=False) if rows else "nothing expires in that window")
+    print(f"{len(rows)} of {len(index)} open listings expire by {now + pd.Timedelta(hours=args.hours)}; "
+          f"{len(index.expire(now))} had already expired")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import os
+from collections import namedtuple
+from functools import cached_property
+
+from food_wastage_app.snapshots import read_table
+
+# Columns pulled from the dimension tables onto each fact table
+PROVIDER_COLUMNS = ["Provider_ID", "Name", "City", "Type"]
+RECEIVER_COLUMNS = ["Receiver_ID", "Name", "City", "Type"]
+LISTING_COLUMNS = [
+    "Food_ID", "Food_Name", "Quantity", "Expiry_Date", "Provider_ID",
+    "Provider_Type", "Location", "Food_Type", "Meal_Type",
+]
+
+# Every column of each source table, in file order
+TABLE_COLUMNS = {
+    "providers": ["Provider_ID", "Name", "Type", "Address", "City", "Contact"],
+    "receivers": ["Receiver_ID", "Name", "Type", "City", "Contact"],
+    "listings": LISTING_COLUMNS,
+    "claims": ["Claim_ID", "Food_ID", "Receiver_ID", "Status", "Timestamp"],
+}
+
+# Source columns each fact table is built from
+FACT_COLUMNS = {
+    "listing_facts": {"listings": LISTING_COLUMNS, "providers": PROVIDER_COLUMNS, "claims": ["Claim_ID", "Food_ID"]},
+    "claim_facts": {
+        "claims": TABLE_COLUMNS["claims"], "receivers": RECEIVER_COLUMNS, "listings": LISTING_COLUMNS,
+    },
+}
+
+# Columns FilterPredicate.pushdown reads, kept in every projection of a table
+FILTER_COLUMNS = {
+    "providers": ["City", "Type"],
+    "receivers": ["City"],
+    "listings": ["Food_Type", "Provider_Type"],
+    "claims": ["Timestamp"],
+}
+
+DATA_FILES = ["providers.csv", "receivers.csv", "listings.csv", "claims.csv"]
+TABLE_FILES = dict(zip(["providers", "receivers", "listings", "claims"], DATA_FILES))
+
+# Raw tables plus the two enriched fact tables, as handed to every query
+Dataset = namedtuple(
+    "Dataset", ["providers", "receivers", "listings", "claims", "listing_facts", "claim_facts"]
+)
+
+
+def data_version(files=DATA_FILES):
+    """Cheap fingerprint of the source files (mtime + size) used as a cache key"""
+    version = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+            version.append((path, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            version.append((path, None, None))
+    return tuple(version)
+
+
+def build_listing_facts(listings, providers, claims):
+    """Listings joined with provider Name/City/Type and their claim count.
+
+    Name, City and Type describe the provider of the listing. ``claims``
+    should be the whole table: a listing claimed outside the sidebar's date
+    range is still claimed.
+    """
+    claims_per_listing = claims.groupby("Food_ID")["Claim_ID"].count().rename("ClaimCount")
+    df = listings.merge(providers[PROVIDER_COLUMNS], on="Provider_ID", how="left")
+    df = df.merge(claims_per_listing, on="Food_ID", how="left")
+    df["ClaimCount"] = df["ClaimCount"].fillna(0).astype("int64")
+    return df
+
+
+def build_claim_facts(claims, receivers, listings):
+    """Claims joined with receiver Name/City/Type and the claimed listing's attributes.
+
+    Name, City and Type describe the receiver who made the claim.
+    """
+    df = claims.merge(receivers[RECEIVER_COLUMNS], on="Receiver_ID", how="left")
+    df = df.merge(listings[LISTING_COLUMNS], on="Food_ID", how="left")
+    return df
+
+
+def build_facts(providers, receivers, listings, claims, all_claims=None):
+    """Build both enriched fact tables in one go; ``all_claims`` (default ``claims``)
+    are the claims counted per listing when ``claims`` was read date-filtered"""
+    return (
+        build_listing_facts(listings, providers, claims if all_claims is None else all_claims),
+        build_claim_facts(claims, receivers, listings),
+    )
+
+
+def build_dataset(providers, receivers, listings, claims, all_claims=None):
+    """Bundle the raw tables with their fact tables"""
+    listing_facts, claim_facts = build_facts(providers, receivers, listings, claims, all_claims)
+    return Dataset(providers, receivers, listings, claims, listing_facts, claim_facts)
+
+
+def narrow_dataset(data, filters):
+    """Apply the post-join part of ``filters`` to the fact tables"""
+    if filters is None:
+        return data
+    return data._replace(
+        listing_facts=filters.apply_listings(data.listing_facts).reset_index(drop=True),
+        claim_facts=filters.apply_claims(data.claim_facts).reset_index(drop=True),
+    )
+
+
+def load_dataset(filters=None):
+    """Load the tables with the filters pushed into the reads, then filter the facts.
+
+    Date-filtered reads of the month-partitioned tables only open the months in range.
+    """
+    # Imported here: partitions builds on this module
+    from food_wastage_app.partitions import PARTITION_COLUMNS, PartitionStore
+
+    partitions = PartitionStore()
+    tables = {}
+    for name, path in TABLE_FILES.items():
+        pushdown = filters.pushdown(name) if filters else None
+        dated = name in PARTITION_COLUMNS and any(col == PARTITION_COLUMNS[name] for col, _, _ in pushdown or [])
+        tables[name] = partitions.read(name, filters=pushdown) if dated else read_table(path, filters=pushdown)
+    all_claims = None
+    if filters is not None and filters.pushdown("claims"):
+        all_claims = read_table(TABLE_FILES["claims"], columns=FACT_COLUMNS["listing_facts"]["claims"])
+    data = build_dataset(tables["providers"], tables["receivers"], tables["listings"], tables["claims"], all_claims)
+    return narrow_dataset(data, filters)
+
+
+class LazyDataset:
+    """Dataset-compatible view over ``get_table`` that loads and joins on first access.
+
+    Gives the same tables as load_dataset(filters), but a view that only
+    touches ``providers`` never reads the other three tables. ``columns``
+    ({table: columns}) narrows the tables to what the views need; tables
+    not listed are read in full. ``get_table(name, columns, pushdown)``
+    returns the table narrowed to the pushdown filters.
+    """
+
+    def __init__(self, get_table, filters=None, columns=None):
+        self.get_table = get_table
+        self.filters = filters
+        self.columns = columns or {}
+
+    def _table(self, name):
+        pushdown = self.filters.pushdown(name) if self.filters else None
+        return self.get_table(name, self.columns.get(name), pushdown)
+
+    @cached_property
+    def providers(self):
+        return self._table("providers")
+
+    @cached_property
+    def receivers(self):
+        return self._table("receivers")
+
+    @cached_property
+    def listings(self):
+        return self._table("listings")
+
+    @cached_property
+    def claims(self):
+        return self._table("claims")
+
+    @cached_property
+    def listing_facts(self):
+        # Claims are counted over the whole table, not the date-filtered ``claims``
+        all_claims = self.get_table("claims", FACT_COLUMNS["listing_facts"]["claims"], None)
+        df = build_listing_facts(self.listings, self.providers, all_claims)
+        return self.filters.apply_listings(df).reset_index(drop=True) if self.filters else df
+
+    @cached_property
+    def claim_facts(self):
+        df = build_claim_facts(self.claims, self.receivers, self.listings)
+        return self.filters.apply_claims(df).reset_index(drop=True) if self.filters else df
@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+import pandas as pd
+
+from food_wastage_app.schema import as_datetime
+
+
+@dataclass(frozen=True)
+class FilterPredicate:
+    """The sidebar filters, normalised so equal selections compare (and hash) equal.
+
+    Listings match on provider city/type, food type and expiry date; claims
+    match on receiver city and claim date, plus the food type and provider
+    type of the claimed listing.
+    """
+
+    cities: tuple = ()
+    provider_types: tuple = ()
+    food_types: tuple = ()
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @classmethod
+    def from_sidebar(cls, cities=(), start_date=None, end_date=None, provider_types=(), food_types=()):
+        return cls(
+            cities=tuple(sorted(map(str, cities))),
+            provider_types=tuple(sorted(map(str, provider_types))),
+            food_types=tuple(sorted(map(str, food_types))),
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    def _bounds(self):
+        """[start, end) timestamps; the end date is inclusive"""
+        start = pd.Timestamp(self.start_date) if self.start_date else None
+        end = pd.Timestamp(self.end_date + timedelta(days=1)) if self.end_date else None
+        return start, end
+
+    def _date_filters(self, col):
+        start, end = self._bounds()
+        filters = []
+        if start is not None:
+            filters.append((col, ">=", start))
+        if end is not None:
+            filters.append((col, "<", end))
+        return filters
+
+    def pushdown(self, table):
+        """Filters that can be applied while reading a table, before any join.
+
+        Only predicates that stay correct for every fact table built from the
+        table are pushed; the rest is applied after the join. The claim date
+        range only narrows the claim facts: listing facts count each
+        listing's claims over the unfiltered table.
+        """
+        filters = []
+        if table == "providers":
+            if self.cities:
+                filters.append(("City", "in", list(self.cities)))
+            if self.provider_types:
+                filters.append(("Type", "in", list(self.provider_types)))
+        elif table == "receivers":
+            if self.cities:
+                filters.append(("City", "in", list(self.cities)))
+        elif table == "listings":
+            if self.food_types:
+                filters.append(("Food_Type", "in", list(self.food_types)))
+            if self.provider_types:
+                filters.append(("Provider_Type", "in", list(self.provider_types)))
+        elif table == "claims":
+            filters.extend(self._date_filters("Timestamp"))
+        return filters or None
+
+    def _between(self, series):
+        start, end = self._bounds()
+        mask = pd.Series(True, index=series.index)
+        if start is not None:
+            mask &= series >= start
+        if end is not None:
+            mask &= series < end
+        return mask
+
+    def apply_listings(self, df):
+        """Filter listing facts (City/Type are the provider's)"""
+        mask = self._between(as_datetime(df["Expiry_Date"]))
+        if self.cities:
+            mask &= df["City"].isin(self.cities)
+        if self.provider_types:
+            mask &= df["Type"].isin(self.provider_types)
+        if self.food_types:
+            mask &= df["Food_Type"].isin(self.food_types)
+        return df[mask]
+
+    def apply_claims(self, df):
+        """Filter claim facts (City is the receiver's)"""
+        mask = self._between(as_datetime(df["Timestamp"]))
+        if self.cities:
+            mask &= df["City"].isin(self.cities)
+        if self.provider_types:
+            mask &= df["Provider_Type"].isin(self.provider_types)
+        if self.food_types:
+            mask &= df["Food_Type"].isin(self.food_types)
+        return df[mask]
+
+    def month_range(self):
+        """(first, last) months covered by the date range, as 'YYYY-MM' strings"""
+        first = pd.Period(self.start_date, "M").strftime("%Y-%m") if self.start_date else None
+        last = pd.Period(self.end_date, "M").strftime("%Y-%m") if self.end_date else None
+        return first, last
+
+    def month_aligned(self):
+        """True when the date range is made of whole months"""
+        start_ok = self.start_date is None or self.start_date.day == 1
+        end_ok = self.end_date is None or (self.end_date + timedelta(days=1)).day == 1
+        return start_ok and end_ok
@@ -0,0 +1,163 @@
+"""Schema migrations for food_wastage.db.
+
+    python -m food_wastage_app.migrations                  # migrate food_wastage.db
+    python -m food_wastage_app.migrations --check          # read-only: pending migrations and index use
+    python -m food_wastage_app.migrations --compare 100    # before/after timings on synthetic data
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from food_wastage_app import synthetic
+from food_wastage_app.database import DATABASE, to_db_frame
+from food_wastage_app.engine import SQLiteEngine
+from food_wastage_app.queries import queries
+
+# (version, statements) applied in order; PRAGMA user_version records progress
+MIGRATIONS = [
+    (1, [
+        # Join and lookup paths; trailing columns make the common aggregates covering
+        "CREATE INDEX IF NOT EXISTS idx_claims_food_id ON claims (food_id, receiver_id)",
+        "CREATE INDEX IF NOT EXISTS idx_claims_receiver_id ON claims (receiver_id, food_id, claim_timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_claims_claim_timestamp ON claims (claim_timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_food_listings_provider_id ON food_listings (provider_id, quantity)",
+        "CREATE INDEX IF NOT EXISTS idx_food_listings_city ON food_listings (city, food_type)",
+        "CREATE INDEX IF NOT EXISTS idx_food_listings_expiry_date ON food_listings (expiry_date)",
+        "CREATE INDEX IF NOT EXISTS idx_food_listings_food_type ON food_listings (food_type, quantity)",
+        "CREATE INDEX IF NOT EXISTS idx_food_listings_created_at ON food_listings (created_at, quantity)",
+        "CREATE INDEX IF NOT EXISTS idx_providers_city ON providers (city)",
+        "CREATE INDEX IF NOT EXISTS idx_providers_lower_city ON providers (LOWER(city))",
+        "CREATE INDEX IF NOT EXISTS idx_receivers_city ON receivers (city)",
+    ]),
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def pending_migrations(conn):
+    """Versions in MIGRATIONS not yet applied to ``conn``"""
+    version = schema_version(conn)
+    return [v for v, _ in MIGRATIONS if v > version]
+
+
+def migrate(conn):
+    """Apply pending migrations and refresh planner statistics; returns the new version"""
+    version = schema_version(conn)
+    pending = [(v, statements) for v, statements in MIGRATIONS if v > version]
+    for v, statements in pending:
+        with conn:
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {int(v)}")
+    if pending:
+        conn.execute("ANALYZE")
+    return schema_version(conn)
+
+
+def open_engine(path=DATABASE):
+    """Migrate ``path`` and return a query engine over it"""
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    conn.close()
+    return SQLiteEngine.from_database(path)
+
+
+def query_plans(engine):
+    """EXPLAIN QUERY PLAN for every query: {id: (indexes used, full scans)}"""
+    plans = {}
+    for query_id, entry in queries.items():
+        sql = engine.translate(entry["query"])
+        params = ("",) * sql.count("?")
+        rows = engine.conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        details = [row[-1] for row in rows]
+        indexes = sorted({d.split(" INDEX ")[1].split(" ")[0] for d in details if " INDEX " in d})
+        scans = [d for d in details if d.startswith("SCAN") and "INDEX" not in d and "SUBQUERY" not in d]
+        plans[query_id] = (indexes, scans)
+    return plans
+
+
+def time_queries(engine, repeat=3):
+    """Best-of-``repeat`` seconds per query"""
+    timings = {}
+    for query_id, entry in queries.items():
+        params = ("City 1",) if "%s" in entry["query"] else ()
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            engine.execute(entry["query"], params)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[query_id] = best
+    return timings
+
+
+def populate(conn, scale):
+    """Fill the app tables with synthetic data (for timing only)"""
+    for name, df in synthetic.generate(scale).items():
+        table, rows = to_db_frame(name, df)
+        rows.to_sql(table, conn, if_exists="append", index=False, chunksize=50_000)
+    conn.commit()
+
+
+def compare(scale, path=DATABASE, repeat=3):
+    """Time every query on a synthetic copy of ``path`` before and after migrating"""
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "bench.db")
+        source = sqlite3.connect(path)
+        conn = sqlite3.connect(copy)
+        # Schema only: recreate the tables without data or indexes
+        for (sql,) in source.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        ):
+            conn.execute(sql)
+        source.close()
+        populate(conn, scale)
+        conn.close()
+
+        engine = SQLiteEngine.from_database(copy)
+        before = time_queries(engine, repeat)
+        migrate(engine.conn)
+        after = time_queries(engine, repeat)
+        plans = query_plans(engine)
+        engine.conn.close()
+    return before, after, plans
+
+
+def print_plans(plans):
+    for query_id, (indexes, scans) in plans.items():
+        status = "ok  " if indexes else "SCAN"
+        print(f"Q{query_id:<3} {status} {', '.join(indexes) or '-'}" + (f"  [{'; '.join(scans)}]" if scans else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DATABASE)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--compare", type=int, metavar="SCALE")
+    args = parser.parse_args()
+
+    if args.compare:
+        before, after, plans = compare(args.compare, args.db)
+        for query_id in queries:
+            print(f"Q{query_id:<3} {before[query_id] * 1000:10.2f} ms -> {after[query_id] * 1000:10.2f} ms")
+        print_plans(plans)
+        return
+    if args.check:
+        # Report only: never migrate or ANALYZE the database being inspected
+        engine = SQLiteEngine.from_database(args.db, readonly=True)
+        pending = pending_migrations(engine.conn)
+        print(f"{args.db}: schema version {schema_version(engine.conn)}, "
+              f"pending migrations: {', '.join(map(str, pending)) or 'none'}")
+        print_plans(query_plans(engine))
+        engine.conn.close()
+        return
+    engine = open_engine(args.db)
+    print(f"{args.db}: schema version {schema_version(engine.conn)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Month-partitioned Parquet copies of claims and listings, with per-day rollups.
+
+    python -m food_wastage_app.partitions             # rebuild stale partition sets
+    python -m food_wastage_app.partitions --status    # rows per month
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from food_wastage_app.facts import TABLE_FILES, data_version
+from food_wastage_app.schema import SCHEMA_VERSION, month_of
+from food_wastage_app.snapshots import SNAPSHOT_DIR, read_table
+
+PARTITION_DIR = os.path.join(SNAPSHOT_DIR, "partitions")
+
+# Table -> the date column its rows are partitioned on, by calendar month
+PARTITION_COLUMNS = {"claims": "Timestamp", "listings": "Expiry_Date"}
+# Rows without a date go here; date-range reads never open it
+NO_MONTH = "none"
+
+# The manifest at the top of a table's root points at its current build
+# directory; the rollups sit next to the month data. The '_' prefix keeps
+# pyarrow from taking them for data if a directory is ever read as one dataset
+MANIFEST_FILE = "_manifest.json"
+ROLLUP_FILE = "_rollup.parquet"
+
+EMPTY_ROLLUPS = {
+    "claims": pd.DataFrame({"Date": pd.Series(dtype="datetime64[us]"), "Status": pd.Series(dtype=str),
+                            "Claims": pd.Series(dtype="int64")}),
+    "listings": pd.DataFrame({"Date": pd.Series(dtype="datetime64[us]"), **{
+        col: pd.Series(dtype="int64") for col in ["Listings", "Quantity"]
+    }}),
+}
+
+
+def month_keys(dates):
+    return dates.dt.strftime("%Y-%m").fillna(NO_MONTH)
+
+
+def daily_rollup(name, df):
+    """Per-day counts of one partition: claims by status, or listings with their quantity"""
+    if name == "claims":
+        day = df["Timestamp"].dt.normalize().rename("Date")
+        return df.groupby([day, df["Status"]], observed=True, dropna=False)["Claim_ID"].count().reset_index(name="Claims")
+    day = df["Expiry_Date"].dt.normalize().rename("Date")
+    return df.assign(Date=day).groupby("Date", dropna=False).agg(
+        Listings=("Food_ID", "count"), Quantity=("Quantity", "sum"),
+    ).astype("int64").reset_index()
+
+
+def _touched_months(filters, column):
+    """(first, last) 'YYYY-MM' months a list of (column, op, value) filters can match, None when open"""
+    first = last = None
+    for col, op, value in filters or []:
+        if col != column:
+            continue
+        value = pd.Timestamp(value)
+        if op in (">=", "=="):
+            first = max(first, value.strftime("%Y-%m")) if first else value.strftime("%Y-%m")
+        if op in ("<=", "=="):
+            last = min(last, value.strftime("%Y-%m")) if last else value.strftime("%Y-%m")
+        if op == "<":
+            # the exclusive bound itself is not read, so a bound on the 1st closes the month before
+            month = (value - pd.Timedelta(microseconds=1)).strftime("%Y-%m")
+            last = min(last, month) if last else month
+    return first, last
+
+
+class PartitionStore:
+    """claims and listings split into month directories (``month=YYYY-MM``).
+
+    Dates are stored parsed, so a date-range read opens only the months the
+    range touches instead of scanning all history. Each month also keeps a
+    small per-day rollup; the trend views add up the rollups of the months
+    they need. A partition set is rebuilt when its source CSV changes.
+
+    Every build goes to its own directory under the table's root and is
+    published by atomically replacing the manifest, so readers keep using
+    the build they started on. Older builds are removed by the build after
+    next.
+    """
+
+    def __init__(self, partition_dir=PARTITION_DIR, files=TABLE_FILES):
+        self.partition_dir = partition_dir
+        self.files = dict(files)
+        self.lock = threading.Lock()
+
+    def root(self, name):
+        return os.path.join(self.partition_dir, f"{name}.v{SCHEMA_VERSION}")
+
+    def _sources_version(self, name):
+        # JSON round trip so it compares equal to what the manifest holds
+        return json.loads(json.dumps(data_version([self.files[name]])))
+
+    def manifest(self, name):
+        path = os.path.join(self.root(name), MANIFEST_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _fresh(self, name, manifest):
+        # Manifests from before builds were versioned have no "build" and are rebuilt
+        return manifest is not None and "build" in manifest and manifest["sources"] == self._sources_version(name)
+
+    def is_fresh(self, name):
+        return self._fresh(name, self.manifest(name))
+
+    def build_dir(self, name, manifest=None):
+        """The directory of the build ``manifest`` (default: the current one) points at"""
+        manifest = self.manifest(name) if manifest is None else manifest
+        return os.path.join(self.root(name), manifest["build"])
+
+    def build(self, name):
+        """Rewrite every partition (and rollup) of ``name`` from its typed snapshot"""
+        version = self._sources_version(name)
+        df = read_table(self.files[name])
+        months = month_keys(df[PARTITION_COLUMNS[name]])
+        root = self.root(name)
+        previous = self.manifest(name)
+        digest = hashlib.blake2b(json.dumps(version).encode(), digest_size=8).hexdigest()
+        # Never reused, so a rebuild of the same sources cannot clobber a build being read
+        build = f"build-{digest}-{os.getpid()}-{time.time_ns()}"
+        build_dir = os.path.join(root, build)
+        for month, part in df.groupby(months, sort=True):
+            month_dir = os.path.join(build_dir, f"month={month}")
+            os.makedirs(month_dir)
+            part.to_parquet(os.path.join(month_dir, "part-0.parquet"), compression="zstd", index=False)
+            daily_rollup(name, part).to_parquet(os.path.join(month_dir, ROLLUP_FILE), index=False)
+        os.makedirs(build_dir, exist_ok=True)
+        manifest = {"sources": version, "build": build, "months": months.value_counts().sort_index().to_dict()}
+        tmp = os.path.join(root, f"{MANIFEST_FILE}.tmp-{os.getpid()}-{threading.get_ident()}")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(root, MANIFEST_FILE))
+        # Readers may still be on the build just replaced; anything older is removed
+        keep = {MANIFEST_FILE, build, (previous or {}).get("build")}
+        for entry in os.listdir(root):
+            if entry not in keep and not entry.startswith(MANIFEST_FILE):
+                shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+        return manifest
+
+    def ensure(self, name):
+        """The current manifest of ``name``, rebuilding first when stale"""
+        manifest = self.manifest(name)
+        if not self._fresh(name, manifest):
+            with self.lock:
+                manifest = self.manifest(name)
+                if not self._fresh(name, manifest):
+                    manifest = self.build(name)
+        return manifest
+
+    def months(self, name, first=None, last=None, manifest=None):
+        """Partition months in [first, last] (either end open when None); undated rows only when both are"""
+        manifest = self.manifest(name) if manifest is None else manifest
+        months = sorted(manifest["months"])
+        if first is None and last is None:
+            return months
+        return [
+            month for month in months
+            if month != NO_MONTH and (first is None or month >= first) and (last is None or month <= last)
+        ]
+
+    def prunes(self, name, filters):
+        """True when the date filters leave at least one partition of ``name`` unread"""
+        first, last = _touched_months(filters, PARTITION_COLUMNS[name])
+        if first is None and last is None:
+            return False
+        manifest = self.ensure(name)
+        return len(self.months(name, first, last, manifest)) < len(self.months(name, manifest=manifest))
+
+    def read(self, name, columns=None, filters=None):
+        """Like snapshots.read_table, but only the partitions the date filters touch are opened"""
+        # One manifest for the whole read: a concurrent build cannot switch months under it
+        manifest = self.ensure(name)
+        root = self.build_dir(name, manifest)
+        months = self.months(name, *_touched_months(filters, PARTITION_COLUMNS[name]), manifest=manifest)
+        if not months:
+            return read_table(self.files[name], columns=columns, filters=filters).iloc[0:0]
+        parts = [
+            pd.read_parquet(os.path.join(root, f"month={month}", "part-0.parquet"),
+                            columns=columns, filters=filters, memory_map=True)
+            for month in months
+        ]
+        # Keep categoricals categorical: concat only does that when the categories agree
+        for col in parts[0].columns:
+            if isinstance(parts[0][col].dtype, pd.CategoricalDtype):
+                categories = union_categoricals([part[col] for part in parts]).categories
+                for part in parts:
+                    part[col] = part[col].cat.set_categories(categories)
+        return pd.concat(parts, ignore_index=True)
+
+    def supports(self, filters):
+        """The rollups only know dates, so any city/type filter needs the fact tables"""
+        return filters is None or not (filters.cities or filters.provider_types or filters.food_types)
+
+    def rollup(self, name, filters=None):
+        """The per-day rollups of the months ``filters`` touches, trimmed to its exact date range"""
+        start, end = filters._bounds() if filters is not None else (None, None)
+        bounds = []
+        if start is not None:
+            bounds.append((PARTITION_COLUMNS[name], ">=", start))
+        if end is not None:
+            bounds.append((PARTITION_COLUMNS[name], "<", end))
+        manifest = self.ensure(name)
+        root = self.build_dir(name, manifest)
+        months = self.months(name, *_touched_months(bounds, PARTITION_COLUMNS[name]), manifest=manifest)
+        rollups = [pd.read_parquet(os.path.join(root, f"month={month}", ROLLUP_FILE)) for month in months]
+        df = pd.concat(rollups, ignore_index=True) if rollups else EMPTY_ROLLUPS[name]
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df["Date"] >= start
+        if end is not None:
+            mask &= df["Date"] < end
+        return df[mask]
+
+    # ---- the trend views, same tables as their analytics.py namesakes ----
+    def monthly_listings(self, filters=None):
+        df = self.rollup("listings", filters)
+        return df.groupby(month_of(df["Date"]).rename("Month"), sort=True)["Listings"].sum().reset_index()
+
+    def monthly_quantity(self, filters=None):
+        df = self.rollup("listings", filters)
+        return df.groupby(month_of(df["Date"]).rename("Month"), sort=True)["Quantity"].sum().reset_index()
+
+    def monthly_claims(self, filters=None):
+        df = self.rollup("claims", filters)
+        return df.groupby(month_of(df["Date"]).rename("Month"), sort=True)["Claims"].sum().reset_index()
+
+    def claims_by_weekday(self, filters=None):
+        df = self.rollup("claims", filters)
+        day = df["Date"].dt.day_name().rename("Day")
+        return (
+            df.groupby(day)["Claims"].sum().reset_index()
+            .sort_values("Claims", ascending=False, kind="stable", ignore_index=True)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true")
+    args = parser.parse_args()
+
+    store = PartitionStore()
+    for name in PARTITION_COLUMNS:
+        if not args.status and not store.is_fresh(name):
+            store.build(name)
+            print(f"Partitions written: {store.build_dir(name)}")
+        manifest = store.manifest(name)
+        if manifest is None:
+            print(f"{name}: not built")
+            continue
+        state = "fresh" if store.is_fresh(name) else "stale"
+        print(f"{name} ({state}): " + ", ".join(f"{month} {rows}" for month, rows in manifest["months"].items()))
+
+
+if __name__ == "__main__":
+    main()
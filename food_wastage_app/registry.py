@@ -0,0 +1,150 @@
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from food_wastage_app import analytics
+from food_wastage_app.facts import FACT_COLUMNS, FILTER_COLUMNS, TABLE_COLUMNS
+from food_wastage_app.queries import queries
+
+# One numbering for the dashboard and queries.py: views answering a
+# queries.py question share its number, app-only views are numbered from 26.
+
+
+@dataclass(frozen=True)
+class View:
+    """A dashboard view: what it reads, how it is computed and how it is drawn.
+
+    ``uses`` names the Dataset fields the computation reads; raw tables in
+    it list their columns in ``columns``. ``source`` picks who answers it:
+    the in-memory facts, the claim rollups, the summary tables, the month
+    partitions or the expiry index (each exposes a method with the
+    analytics function's name, and the facts answer whenever they cannot
+    serve the filters).
+    """
+
+    id: int
+    label: str
+    category: str
+    compute: Callable
+    uses: tuple
+    columns: dict = field(default_factory=dict)
+    source: str = "facts"
+    chart: Optional[tuple] = None
+    layout: str = "stacked"
+    sql: Optional[int] = None
+
+    @property
+    def name(self):
+        return self.compute.__name__
+
+    @property
+    def title(self):
+        return f"Q{self.id}. {self.label}"
+
+
+def _bar(x, y, title, **spec):
+    return ("bar", dict(x=x, y=y, title=title, **spec))
+
+
+VIEWS = {view.id: view for view in [
+    View(1, "Providers by City", "Provider Analysis", analytics.providers_by_city,
+         uses=("providers",), columns={"providers": ["Name", "City"]},
+         chart=_bar("City", "Providers", None, figsize=(8, 5)), layout="side_by_side", sql=1),
+    View(2, "Receivers by City", "Receiver Analysis", analytics.receivers_by_city,
+         uses=("receivers",), columns={"receivers": ["Name", "City"]}, sql=2),
+    View(3, "Top Provider Types", "Provider Analysis", analytics.quantity_by_provider_type,
+         uses=("listing_facts",), source="summaries",
+         chart=_bar("Type", "Quantity", "Total Quantity by Provider Type"), sql=3),
+    View(4, "Provider Contacts by City", "Provider Analysis", analytics.provider_contacts,
+         uses=("providers",), columns={"providers": ["Name", "Type", "City", "Contact", "Address"]},
+         layout="wide_table", sql=4),
+    View(5, "Receiver Claiming the Most Food", "Receiver Analysis", analytics.top_receivers_by_claims,
+         uses=("claim_facts",), chart=_bar("Name", "Claims", "Top Receivers by Number of Claims"), sql=5),
+    View(7, "Cities with Highest Food Listings", "Listings & Food Analysis", analytics.listings_by_city,
+         uses=("listing_facts",), chart=_bar("City", "Listings", "Top Cities by Number of Listings"), sql=7),
+    View(8, "Most Common Food Type", "Listings & Food Analysis", analytics.food_type_counts,
+         uses=("listing_facts",), chart=_bar("Food Type", "Count", "Most Commonly Listed Food Types"), sql=8),
+    View(9, "Top 10 Providers by Contribution", "Provider Analysis", analytics.top_providers_by_quantity,
+         uses=("listing_facts",), chart=_bar("Name", "Quantity", "Top 10 Providers by Total Quantity"), sql=9),
+    View(10, "Monthly Trend of Claims", "Claims & Wastage", analytics.monthly_claims,
+         uses=("claim_facts",), source="rollups",
+         chart=("line", dict(x="Month", y="Claims", title="Monthly Trend of Claims")), sql=10),
+    View(12, "City Wasting the Most Food", "Claims & Wastage", analytics.unclaimed_by_city,
+         uses=("listing_facts",), chart=_bar("City", "Unclaimed Listings", "Unclaimed Listings by City"), sql=12),
+    View(18, "Quantity Listed per Month", "Listings & Food Analysis", analytics.monthly_quantity,
+         uses=("listing_facts",), source="partitions",
+         chart=("line", dict(x="Month", y="Quantity", title="Total Quantity Listed per Month (by Expiry Month)")), sql=18),
+    View(22, "Busiest Claim Weekday", "Claims & Wastage", analytics.claims_by_weekday,
+         uses=("claim_facts",), source="partitions", chart=_bar("Day", "Claims", "Claims by Day of the Week"), sql=22),
+    View(26, "Number of Claims per City", "Claims & Wastage", analytics.claims_by_city,
+         uses=("claim_facts",), source="rollups", chart=_bar("City", "Claims", "Claims by City")),
+    View(27, "Success Rate of Claims", "Claims & Wastage", analytics.claim_status_rates,
+         uses=("claim_facts",), source="rollups",
+         chart=("pie", dict(y="Rate", labels="Status", title="Claim Status Distribution"))),
+    View(28, "Avg. Food per Provider Type", "Provider Analysis", analytics.avg_quantity_by_provider_type,
+         uses=("listing_facts",), source="summaries",
+         chart=_bar("Type", "Quantity", "Average Quantity per Provider Type")),
+    View(29, "City with Highest Claim Success Rate", "Claims & Wastage", analytics.success_rate_by_city,
+         uses=("claim_facts",), source="rollups",
+         chart=_bar("City", "Success_Rate", "Claim Success Rate by City (%)")),
+    View(30, "Receiver Type Benefiting Most", "Receiver Analysis", analytics.claims_by_receiver_type,
+         uses=("claim_facts",), source="rollups", chart=_bar("Type", "Claims", "Claims by Receiver Type")),
+    View(31, "Monthly Trend of Food Listings", "Listings & Food Analysis", analytics.monthly_listings,
+         uses=("listing_facts",), source="partitions",
+         chart=("line", dict(x="Month", y="Listings", title="Monthly Trend of Food Listings (by Expiry Month)"))),
+    View(32, "Provider Type Wasting the Least", "Claims & Wastage", analytics.unclaimed_rate_by_provider_type,
+         uses=("listing_facts",),
+         chart=_bar("Type", "Unclaimed_Rate", "Unclaimed Listings Rate by Provider Type (%) – Lower is Better")),
+    View(33, "Demand vs Supply per City", "Supply vs Demand", analytics.supply_vs_demand,
+         uses=("listing_facts", "claim_facts"),
+         chart=("grouped_bar", dict(x="City", y=("Supply", "Demand"), title="Supply (Quantity) vs Demand (Claims) per City"))),
+    View(34, "Listings by Category per City", "Listings & Food Analysis", analytics.listings_by_city_and_food_type,
+         uses=("listing_facts",), chart=_bar("City", "Listings", "Listings by City & Food Type", hue="Food_Type")),
+    View(35, "Most Balanced Supply-Demand City", "Supply vs Demand", analytics.balanced_cities,
+         uses=("listing_facts", "claim_facts"),
+         chart=_bar("City", "Balance_Gap", "Most Balanced Cities (Lower Gap = Better)")),
+    View(36, "Provider Contribution Distribution", "Provider Analysis", analytics.contribution_by_provider_type,
+         uses=("listing_facts",), source="summaries",
+         chart=("pie", dict(y="Quantity", labels="Type", title="Provider Contribution Distribution"))),
+    View(37, "Receiver Claim Distribution", "Receiver Analysis", analytics.claim_share_by_receiver_type,
+         uses=("claim_facts",), source="summaries",
+         chart=("pie", dict(y="Claims", labels="Type", title="Receiver Claim Distribution"))),
+    View(38, "Food Availability Heatmap", "Listings & Food Analysis", analytics.availability_heatmap,
+         uses=("listing_facts",), source="summaries",
+         chart=("heatmap", dict(title="Food Availability (Quantity) Heatmap", rotate=False))),
+    View(39, "Wastage Reduction Trend", "Claims & Wastage", analytics.unclaimed_trend,
+         uses=("listing_facts",),
+         chart=("line", dict(x="Month", y="Unclaimed_Rate_%", title="Unclaimed Listings Rate Over Time (%)"))),
+    View(40, "Listings Closest to Expiry", "Listings & Food Analysis", analytics.expiring_soon,
+         uses=("listing_facts",), source="expiry", layout="wide_table"),
+]}
+
+CATEGORIES = ["Provider Analysis", "Receiver Analysis", "Listings & Food Analysis", "Claims & Wastage", "Supply vs Demand"]
+
+# queries.py questions the dashboard has no view for; they run through the SQL engine only
+SQL_ONLY = [query_id for query_id in queries if query_id not in {view.sql for view in VIEWS.values()}]
+
+
+def menu():
+    """{category: [view title, ...]} in id order"""
+    return {
+        category: [view.title for view in VIEWS.values() if view.category == category]
+        for category in CATEGORIES
+    }
+
+
+def view_for(title):
+    """The view behind a menu title like 'Q12. City Wasting the Most Food'"""
+    return VIEWS[int(title.split(".", 1)[0][1:])]
+
+
+def required_columns(views):
+    """{table: columns} to read for ``views``, including what the joins and filters need.
+
+    Batching several views takes the union, so each table is scanned once.
+    """
+    needed = {}
+    for view in views:
+        for use in view.uses:
+            for table, columns in FACT_COLUMNS.get(use, {use: view.columns.get(use, [])}).items():
+                needed.setdefault(table, set()).update(columns, FILTER_COLUMNS[table])
+    return {table: [col for col in TABLE_COLUMNS[table] if col in columns] for table, columns in needed.items()}
@@ -0,0 +1,153 @@
+"""Headless export of every registry view (and the SQL-only questions) in one pass.
+
+    python -m food_wastage_app.report                          # csv + html into reports/<timestamp>/
+    python -m food_wastage_app.report --format parquet csv html --workers 8
+    python -m food_wastage_app.report --views 1 5 10 --out reports/weekly --no-sql
+    python -m food_wastage_app.report --database food_wastage.db  # SQL-only questions from the app database
+"""
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from food_wastage_app import registry
+from food_wastage_app.engine import get_engine
+from food_wastage_app.facts import FACT_COLUMNS
+from food_wastage_app.queries import queries
+from food_wastage_app.store import DataStore
+
+REPORT_DIR = "reports"
+FORMATS = ["csv", "parquet", "html"]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _run(fn, *args):
+    """(result, seconds, error); a failing query is reported instead of aborting the batch"""
+    start = time.perf_counter()
+    try:
+        result, error = fn(*args), None
+    except Exception as exc:
+        result, error = None, f"{type(exc).__name__}: {str(exc).strip().splitlines()[-1]}"
+    return result, time.perf_counter() - start, error
+
+
+def group_views(views):
+    """{fact tables read: [views]}; views in a group share the same joins"""
+    groups = {}
+    for view in views:
+        groups.setdefault(tuple(use for use in view.uses if use in FACT_COLUMNS) or ("raw",), []).append(view)
+    return groups
+
+
+def run_views(views, store=None, filters=None, workers=4):
+    """Compute ``views`` over one shared dataset.
+
+    Every table is read once with the union of the columns the views need,
+    every join once, then the views run on a thread pool. Returns
+    ({view id: (result, seconds, error)}, {shared step: seconds}).
+    """
+    store = store or DataStore()
+    columns = registry.required_columns(views)
+    steps = {}
+    _, steps["load tables"] = timed(store.preload, columns)
+    data = store.dataset(filters, columns)
+    joins = sorted({use for group in group_views(views) for use in group if use in FACT_COLUMNS})
+    for name in columns:
+        getattr(data, name)  # pushdown filters, once, before the joins share them
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for name, (_, seconds) in zip(joins, pool.map(lambda name: timed(getattr, data, name), joins)):
+            steps[f"join {name}"] = seconds
+        futures = {
+            view.id: pool.submit(_run, view.compute, data)
+            for group in group_views(views).values() for view in group
+        }
+        return {view_id: future.result() for view_id, future in futures.items()}, steps
+
+
+def run_sql(query_ids, database=None):
+    """queries.py questions through the SQL engine, one connection, in order"""
+    engine, seconds = timed(get_engine, "sqlite", database)
+    return {query_id: _run(engine.run, query_id) for query_id in query_ids}, {"sql engine": seconds}
+
+
+def _flat(result):
+    """A plain table for export: index levels become columns, labels become strings"""
+    if not isinstance(result.index, pd.RangeIndex) or any(result.index.names):
+        result = result.reset_index()
+    result = result.copy()
+    result.columns = [str(col) for col in result.columns]
+    return result
+
+
+def write_report(entries, out_dir, formats, timings):
+    """Write each result as out_dir/<key>.<format>; html goes into a single report.html"""
+    os.makedirs(out_dir, exist_ok=True)
+    sections = []
+    for key, title, result in entries:
+        if result is None:
+            continue
+        table = _flat(result)
+        if "csv" in formats:
+            table.to_csv(os.path.join(out_dir, f"{key}.csv"), index=False)
+        if "parquet" in formats:
+            table.to_parquet(os.path.join(out_dir, f"{key}.parquet"), index=False)
+        sections.append(f"<h2>{html.escape(title)}</h2>\n{table.to_html(index=False)}")
+    timings.to_csv(os.path.join(out_dir, "timings.csv"), index=False)
+    if "html" in formats:
+        with open(os.path.join(out_dir, "report.html"), "w") as f:
+            f.write("<html><head><meta charset='utf-8'><title>FoodRescue report</title></head><body>\n")
+            f.write("\n".join(sections))
+            f.write(f"\n<h2>Timings</h2>\n{timings.to_html(index=False)}\n</body></html>\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--views", type=int, nargs="+", help="view ids (default: all)")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["csv", "html"])
+    parser.add_argument("--out", help=f"output directory (default: {REPORT_DIR}/<timestamp>)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--database", help="run the SQL-only questions against this SQLite database")
+    parser.add_argument("--no-sql", action="store_true", help="skip the queries.py questions without a view")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    views = [registry.VIEWS[view_id] for view_id in args.views] if args.views else list(registry.VIEWS.values())
+    view_results, steps = run_views(views, workers=args.workers)
+    sql_results = {}
+    if not args.no_sql and not args.views:
+        sql_results, sql_steps = run_sql(registry.SQL_ONLY, args.database)
+        steps.update(sql_steps)
+
+    entries, rows = [], []
+    for view in views:
+        result, seconds, error = view_results[view.id]
+        entries.append((f"q{view.id:02d}_{view.name}", view.title, result))
+        group = "+".join(use for use in view.uses if use in FACT_COLUMNS) or "raw"
+        rows.append((f"Q{view.id}", view.label, group, seconds, None if result is None else len(result), error))
+    for query_id, (result, seconds, error) in sql_results.items():
+        question = queries[query_id]["question"]
+        entries.append((f"sql{query_id:02d}", f"SQL {query_id}. {question}", result))
+        rows.append((f"SQL{query_id}", question, "sql", seconds, None if result is None else len(result), error))
+    rows += [(step, "", "shared", seconds, None, None) for step, seconds in steps.items()]
+    total = time.perf_counter() - started
+    rows.append(("total", "", "", total, None, None))
+    timings = pd.DataFrame(rows, columns=["query", "label", "group", "seconds", "rows", "error"])
+    timings["rows"] = timings["rows"].astype("Int64")
+
+    out_dir = args.out or os.path.join(REPORT_DIR, datetime.now().strftime("%Y%m%d-%H%M%S"))
+    write_report(entries, out_dir, args.format, timings)
+    print(timings.to_string(index=False, na_rep=""))
+    print(f"wrote {len(entries)} results to {out_dir} in {total:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
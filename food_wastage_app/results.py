@@ -0,0 +1,124 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    used REAL NOT NULL,
+    value BLOB NOT NULL
+)
+"""
+
+
+class ResultCache:
+    """View results keyed by (query id, filter predicate, data version).
+
+    Entries are evicted least-recently-used beyond ``max_entries`` and
+    expire ``ttl`` seconds after they were computed. With ``path`` set,
+    results are also pickled into a SQLite file so a restarted app starts
+    warm; the data version in the key keeps stale entries from matching.
+    """
+
+    def __init__(self, max_entries=256, ttl=3600, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.disk_hits = self.evictions = self.expirations = 0
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(DISK_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def make_key(query_id, filters, version):
+        # FilterPredicate is normalised and frozen, so its repr is stable across restarts
+        return hashlib.sha256(repr((query_id, filters, version)).encode()).hexdigest()
+
+    def _expired(self, created, now):
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, key):
+        """Cached value or None"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                created, value = entry
+                if not self._expired(created, now):
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+                self.expirations += 1
+        if self.path:
+            with self._connect() as conn:
+                row = conn.execute("SELECT created, value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None and not self._expired(row[0], now):
+                    conn.execute("UPDATE results SET used = ? WHERE key = ?", (now, key))
+                    value = pickle.loads(row[1])
+                    with self.lock:
+                        self._remember(key, row[0], value)
+                        self.hits += 1
+                        self.disk_hits += 1
+                    return value
+                if row is not None:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key, created, value):
+        self.entries[key] = (created, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def put(self, key, value):
+        now = time.time()
+        with self.lock:
+            self._remember(key, now, value)
+        if self.path:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                             (key, now, now, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+                # Same bound on disk, dropping the least recently used
+                conn.execute(
+                    "DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY used DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+
+    def get_or_compute(self, query_id, filters, version, compute):
+        key = self.make_key(query_id, filters, version)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        if self.path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM results")
+
+    def metrics(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "disk_hits": self.disk_hits, "evictions": self.evictions, "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,266 @@
+import hashlib
+import io
+import os
+import threading
+from collections import Counter
+
+import pandas as pd
+
+from food_wastage_app.aggregates import as_percent, share_of_total
+from food_wastage_app.schema import month_of
+
+# A rollup cell: receiver city, receiver type, claim status, claim month
+KEYS = ["City", "Type", "Status", "Month"]
+
+# Bytes before the read offset that CsvTail fingerprints (with the header line)
+FINGERPRINT_WINDOW = 64 * 2**10
+
+
+class CsvTail:
+    """Reads the rows appended to a CSV file since the previous call.
+
+    The header line and the last FINGERPRINT_WINDOW bytes read are
+    fingerprinted with a hash, so a file rewritten in place is reported as
+    rewritten even when it grew, instead of its shifted tail being parsed
+    as new rows. The check costs the same however long the file gets; an
+    edit that changes neither the length of the rows nor any byte in the
+    window goes unnoticed. A file with the same inode, size and mtime as at
+    the last read is not opened at all.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.header = None
+        # Fingerprint of the bytes before offset, and (inode, size, mtime) at the last read
+        self.digest = None
+        self.stat = None
+
+    def changed(self):
+        """False when the file is exactly as it was at the last read"""
+        try:
+            return _stat(os.stat(self.path)) != self.stat
+        except FileNotFoundError:
+            return True
+
+    def skip_to_end(self):
+        """Mark every complete line currently in the file as read"""
+        with open(self.path, "rb") as f:
+            stat = _stat(os.fstat(f.fileno()))
+            self.header = list(pd.read_csv(f, nrows=0).columns)
+            end = stat[1]
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            self.digest = _fingerprint(f, end)
+        self.offset = end
+        self.stat = stat
+
+    def read_new(self):
+        """Return the new rows, or None when the file was truncated/rewritten"""
+        with open(self.path, "rb") as f:
+            stat = _stat(os.fstat(f.fileno()))
+            if stat == self.stat:
+                return pd.DataFrame(columns=self.header or [])
+            size = stat[1]
+            if self.digest is not None and (size < self.offset or _fingerprint(f, self.offset) != self.digest):
+                self.reset()
+                return None
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+            self.stat = stat
+            # Only consume complete lines; a half-written row is picked up next time
+            end = chunk.rfind(b"\n") + 1
+            if end == 0:
+                return pd.DataFrame(columns=self.header or [])
+            self.digest = _fingerprint(f, self.offset + end)
+        chunk = chunk[:end]
+        if self.header is None:
+            df = pd.read_csv(io.BytesIO(chunk))
+            self.header = list(df.columns)
+        else:
+            df = pd.read_csv(io.BytesIO(chunk), names=self.header, header=None)
+        self.offset += end
+        return df
+
+
+def _stat(st):
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+def _fingerprint(f, end, window=FINGERPRINT_WINDOW):
+    """Hash of the header line and the ``window`` bytes before ``end`` of ``f``"""
+    f.seek(0)
+    header = f.readline(window)
+    start = max(0, end - window)
+    f.seek(start)
+    return hashlib.blake2b(header + f.read(end - start), digest_size=16).hexdigest()
+
+
+def read_claims_since(conn, last_id=0):
+    """Claims added to the app database (food_wastage.db) after ``last_id``, in CSV column names"""
+    df = pd.read_sql_query(
+        "SELECT id, receiver_id, status, claim_timestamp FROM claims WHERE id > ? ORDER BY id",
+        conn, params=(last_id,),
+    )
+    return pd.DataFrame({
+        "Claim_ID": df["id"],
+        "Receiver_ID": df["receiver_id"],
+        "Status": df["status"].str.title(),
+        "Timestamp": df["claim_timestamp"],
+    })
+
+
+class ClaimRollups:
+    """Claim counts per (receiver city, receiver type, status, month), maintained from deltas.
+
+    New claims add to their cell; a claim seen again (e.g. a status change)
+    moves from its previous cell to the new one, so nothing is recomputed
+    from history.
+    """
+
+    def __init__(self, receivers):
+        self.receivers = receivers.set_index("Receiver_ID")[["City", "Type"]]
+        self.counts = Counter()
+        self.claim_keys = {}
+        self.source = None
+        self.last_db_id = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_csv(cls, path, receivers):
+        rollups = cls(receivers)
+        rollups.source = CsvTail(path)
+        rollups.refresh()
+        return rollups
+
+    def _keyed(self, claims):
+        df = claims[["Claim_ID", "Receiver_ID", "Status", "Timestamp"]].join(self.receivers, on="Receiver_ID")
+        month = month_of(df["Timestamp"])
+        keyed = pd.DataFrame({
+            "Claim_ID": df["Claim_ID"].to_numpy(),
+            "City": df["City"].astype(object).to_numpy(),
+            "Type": df["Type"].astype(object).to_numpy(),
+            "Status": df["Status"].astype(object).to_numpy(),
+            "Month": month.to_numpy(),
+        })
+        return keyed.drop_duplicates("Claim_ID", keep="last")
+
+    def apply(self, claims):
+        """Apply new or updated claim rows (Claim_ID, Receiver_ID, Status, Timestamp)"""
+        if claims is None or claims.empty:
+            return 0
+        keyed = self._keyed(claims)
+        with self.lock:
+            known = keyed["Claim_ID"].isin(self.claim_keys.keys())
+            fresh = keyed[~known]
+            # Bulk path for new claims: one groupby per delta
+            sizes = fresh.groupby(KEYS, dropna=False).size()
+            self.counts.update(dict(zip(sizes.index, sizes.to_numpy())))
+            self.claim_keys.update(zip(fresh["Claim_ID"], fresh[KEYS].itertuples(index=False, name=None)))
+            # Updated claims move between cells one by one
+            for claim_id, key in zip(keyed.loc[known, "Claim_ID"], keyed.loc[known, KEYS].itertuples(index=False, name=None)):
+                self._move(claim_id, key)
+        return len(keyed)
+
+    def set_status(self, claim_id, status):
+        """Record a status transition for a known claim"""
+        with self.lock:
+            old = self.claim_keys[claim_id]
+            self._move(claim_id, old[:2] + (status,) + old[3:])
+
+    def _move(self, claim_id, key):
+        old = self.claim_keys.get(claim_id)
+        if old is not None:
+            self.counts[old] -= 1
+            if not self.counts[old]:
+                del self.counts[old]
+        self.counts[key] += 1
+        self.claim_keys[claim_id] = key
+
+    def clear(self):
+        with self.lock:
+            self.counts.clear()
+            self.claim_keys.clear()
+            self.last_db_id = 0
+
+    def refresh(self):
+        """Apply rows appended to the CSV source; rebuild if the file was rewritten"""
+        new = self.source.read_new()
+        if new is None:
+            self.clear()
+            new = self.source.read_new()
+        return self.apply(new)
+
+    def refresh_from_db(self, conn):
+        """Apply claims inserted into the database since the last call"""
+        new = read_claims_since(conn, self.last_db_id)
+        applied = self.apply(new)
+        if applied:
+            self.last_db_id = int(new["Claim_ID"].max())
+        return applied
+
+    # =========================
+    # Views over the rollup
+    # =========================
+    def supports(self, filters):
+        """True when the filters can be answered from the rollup keys alone"""
+        return filters is None or (
+            not filters.provider_types and not filters.food_types and filters.month_aligned()
+        )
+
+    def frame(self, filters=None):
+        with self.lock:
+            items = list(self.counts.items())
+        df = pd.DataFrame([key for key, _ in items], columns=KEYS)
+        df["Claims"] = [count for _, count in items]
+        if filters is not None:
+            if filters.cities:
+                df = df[df["City"].isin(filters.cities)]
+            first, last = filters.month_range()
+            if first:
+                df = df[df["Month"] >= first]
+            if last:
+                df = df[df["Month"] <= last]
+        return df
+
+    def claims_by_city(self, filters=None):
+        df = self.frame(filters)
+        return (
+            df.groupby("City")["Claims"].sum().reset_index()
+            .sort_values("Claims", ascending=False)
+        )
+
+    def claims_by_receiver_type(self, filters=None):
+        df = self.frame(filters)
+        return (
+            df.groupby("Type")["Claims"].sum().reset_index()
+            .sort_values("Claims", ascending=False)
+        )
+
+    def claim_share_by_receiver_type(self, filters=None):
+        return self.frame(filters).groupby("Type")["Claims"].sum().reset_index()
+
+    def claim_status_rates(self, filters=None):
+        totals = self.frame(filters).groupby("Status")["Claims"].sum()
+        return as_percent(share_of_total(totals)).sort_values(ascending=False).reset_index(name="Rate")
+
+    def success_rate_by_city(self, filters=None):
+        df = self.frame(filters)
+        df = df.assign(Completed=df["Claims"].where(df["Status"] == "Completed", 0))
+        agg = df.groupby("City")[["Completed", "Claims"]].sum()
+        result = (agg["Completed"] / agg["Claims"]).reset_index(name="Success_Rate")
+        result = result.sort_values("Success_Rate", ascending=False)
+        result["Success_Rate"] = as_percent(result["Success_Rate"])
+        return result
+
+    def monthly_claims(self, filters=None):
+        return self.frame(filters).groupby("Month")["Claims"].sum().reset_index()
@@ -0,0 +1,93 @@
+"""In-memory schema for the four core tables.
+
+    python -m food_wastage_app.schema    # memory used by the raw vs typed tables and facts
+"""
+import numpy as np
+import pandas as pd
+
+# Bumped whenever the rules below change, so typed snapshots get rebuilt
+SCHEMA_VERSION = 2
+
+# IDs and quantities fit comfortably in 32 bits; aggregations still widen sums
+INT32_COLUMNS = ["Provider_ID", "Receiver_ID", "Food_ID", "Claim_ID", "Quantity"]
+# Low-cardinality text, always dictionary-encoded
+CATEGORY_COLUMNS = ["City", "Type", "Food_Type", "Meal_Type", "Status", "Provider_Type", "Location"]
+# Dictionary-encoded only when values repeat enough to pay for the dictionary
+# (receiver names repeat across claims; provider names are mostly unique)
+MAYBE_CATEGORY_COLUMNS = ["Name", "Food_Name"]
+MAX_CATEGORY_RATIO = 0.5
+# Parsed once at ingest instead of on every query
+DATE_COLUMNS = ["Timestamp", "Expiry_Date"]
+
+INT32_MIN, INT32_MAX = np.iinfo("int32").min, np.iinfo("int32").max
+
+
+def downcast_int32(series):
+    """int32 when every value fits, otherwise the series unchanged"""
+    if not pd.api.types.is_integer_dtype(series) or series.empty:
+        return series
+    if series.min() < INT32_MIN or series.max() > INT32_MAX:
+        return series
+    return series.astype("int32")
+
+
+def as_datetime(series):
+    """``series`` as datetime64, parsing (errors -> NaT) only when it is still text"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series, errors="coerce")
+
+
+def month_of(series):
+    """'YYYY-MM' month of each date ('NaT' where the date is missing)"""
+    return as_datetime(series).dt.to_period("M").astype(str)
+
+
+def apply_schema(df):
+    """Parse dates, downcast integers and dictionary-encode text columns in place"""
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = as_datetime(df[col])
+    for col in INT32_COLUMNS:
+        if col in df.columns:
+            df[col] = downcast_int32(df[col])
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in MAYBE_CATEGORY_COLUMNS:
+        if col in df.columns and len(df) and df[col].nunique() <= MAX_CATEGORY_RATIO * len(df):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def memory_report(raw, typed):
+    """Per-table memory for two {name: DataFrame} dicts with the same keys"""
+    rows = []
+    for name, df in raw.items():
+        before, after = memory_mb(df), memory_mb(typed[name])
+        rows.append({
+            "table": name, "rows": len(df), "raw_mb": round(before, 3), "typed_mb": round(after, 3),
+            "saved_pct": round((1 - after / before) * 100, 1) if before else 0.0,
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    # Imported here: facts reads through snapshots, which imports this module
+    from food_wastage_app.facts import TABLE_FILES, build_facts
+
+    raw = {name: pd.read_csv(path) for name, path in TABLE_FILES.items()}
+    typed = {name: apply_schema(df.copy()) for name, df in raw.items()}
+    for tables in (raw, typed):
+        tables["listing_facts"], tables["claim_facts"] = build_facts(
+            tables["providers"], tables["receivers"], tables["listings"], tables["claims"]
+        )
+    print(memory_report(raw, typed).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
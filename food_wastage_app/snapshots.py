@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from food_wastage_app.schema import DATE_COLUMNS, SCHEMA_VERSION, apply_schema
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:  # snapshots are an optimisation, CSV still works without them
+    HAS_PYARROW = False
+
+SNAPSHOT_DIR = "snapshots"
+
+# Snapshots are sorted on the first date column present (see schema.py) so
+# date filters can skip whole row groups
+ROW_GROUP_SIZE = 64_000
+
+DATA_FILES = ["providers.csv", "receivers.csv", "listings.csv", "claims.csv"]
+
+# Parquet metadata key holding the [size, mtime_ns] of the CSV a snapshot was built from
+SOURCE_KEY = b"food_wastage.source"
+
+
+def snapshot_path(csv_path, snapshot_dir=SNAPSHOT_DIR):
+    """Location of the Parquet snapshot for a CSV file (per resolved path and schema version)"""
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    digest = hashlib.sha1(os.path.realpath(csv_path).encode()).hexdigest()[:10]
+    return os.path.join(snapshot_dir, f"{name}-{digest}.v{SCHEMA_VERSION}.parquet")
+
+
+def source_version(csv_path):
+    stat = os.stat(csv_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def is_fresh(csv_path, snapshot_dir=SNAPSHOT_DIR):
+    """True when a snapshot exists and was built from the CSV as it is now (same size and mtime)"""
+    import pyarrow.parquet as pq
+
+    path = snapshot_path(csv_path, snapshot_dir)
+    if not os.path.exists(path):
+        return False
+    built_from = (pq.read_schema(path).metadata or {}).get(SOURCE_KEY)
+    return built_from is not None and json.loads(built_from) == source_version(csv_path)
+
+
+def apply_types(df):
+    """Apply the in-memory schema (dates, int32 ids, categories) in place"""
+    return apply_schema(df)
+
+
+def read_csv_typed(csv_path, columns=None):
+    """Read a CSV straight into the snapshot dtypes"""
+    return apply_types(pd.read_csv(csv_path, usecols=columns))
+
+
+def build_snapshot(csv_path, snapshot_dir=SNAPSHOT_DIR):
+    """Convert one CSV into a compressed, typed Parquet snapshot"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Taken before the read: a CSV changing meanwhile leaves the snapshot stale, not wrong
+    version = source_version(csv_path)
+    df = read_csv_typed(csv_path)
+    sort_columns = [col for col in DATE_COLUMNS if col in df.columns][:1]
+    if sort_columns:
+        df = df.sort_values(sort_columns, kind="stable", ignore_index=True)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = snapshot_path(csv_path, snapshot_dir)
+    # Write next to the target and swap so readers never see a partial file
+    tmp_path = path + ".tmp"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, SOURCE_KEY: json.dumps(version)})
+    pq.write_table(table, tmp_path, compression="zstd", row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp_path, path)
+    return df
+
+
+def apply_filters(df, filters):
+    """Apply pyarrow-style (column, op, value) filters to a DataFrame"""
+    mask = pd.Series(True, index=df.index)
+    for col, op, value in filters or []:
+        if op == "in":
+            mask &= df[col].isin(value)
+        elif op == ">=":
+            mask &= df[col] >= value
+        elif op == "<":
+            mask &= df[col] < value
+        elif op == "<=":
+            mask &= df[col] <= value
+        elif op == "==":
+            mask &= df[col] == value
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+    return df[mask].reset_index(drop=True)
+
+
+def read_table(csv_path, columns=None, filters=None, snapshot_dir=SNAPSHOT_DIR):
+    """Load a table from its snapshot, rebuilding it from CSV when stale.
+
+    ``columns`` limits the read to the listed columns; ``filters`` is a list
+    of (column, op, value) tuples used to skip row groups and rows.
+    """
+    if not HAS_PYARROW:
+        df = apply_filters(read_csv_typed(csv_path), filters)
+        return df[columns] if columns is not None else df
+    if not is_fresh(csv_path, snapshot_dir):
+        df = apply_filters(build_snapshot(csv_path, snapshot_dir), filters)
+        return df[columns] if columns is not None else df
+    return pd.read_parquet(
+        snapshot_path(csv_path, snapshot_dir), columns=columns, filters=filters, memory_map=True
+    )
+
+
+def drop_unused_categories(df):
+    """Drop categories a filtered/aggregated frame no longer uses (keeps charts tidy)"""
+    df = df.copy()
+    for col in df.select_dtypes("category").columns:
+        df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
+def ingest(files=DATA_FILES, snapshot_dir=SNAPSHOT_DIR):
+    """Refresh every stale snapshot"""
+    for csv_path in files:
+        if not is_fresh(csv_path, snapshot_dir):
+            build_snapshot(csv_path, snapshot_dir)
+            print(f"Snapshot written: {snapshot_path(csv_path, snapshot_dir)}")
+
+
+if __name__ == "__main__":
+    ingest()
@@ -0,0 +1,257 @@
+"""Nearest-provider and nearby-listing search over latitude/longitude.
+
+    python -m food_wastage_app.spatial --bench                       # build + query latency at 300k points
+    python -m food_wastage_app.spatial --bench --points 1000000 --radius 2
+    python -m food_wastage_app.spatial --db food_wastage.db --receiver 12 --radius 5
+"""
+import argparse
+import math
+import sqlite3
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from food_wastage_app.schema import as_datetime
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Longitude degrees shrink towards the poles; clamp so the search box stays finite
+MIN_COS_LAT = 0.01
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_km_array(lat, lon, lats, lons):
+    """Distances from one point to arrays of points (numpy)"""
+    lat, lon, lats, lons = np.radians(lat), np.radians(lon), np.radians(lats), np.radians(lons)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+class GridIndex:
+    """Points bucketed into a fixed grid of ``cell_km``-sized cells (in degrees of latitude).
+
+    A radius query only visits the cells overlapping the query's bounding
+    box and checks exact (haversine) distances there; k-nearest widens the
+    radius until k points fall inside it. Adding, moving or removing a
+    point touches one or two cells, so the index is built once and kept
+    current incrementally.
+    """
+
+    def __init__(self, cell_km=2.0):
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self.cells = defaultdict(dict)
+        self.points = {}
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell(self, lat, lon):
+        return int(lat // self.cell_deg), int(lon // self.cell_deg)
+
+    def add(self, key, lat, lon):
+        """Insert ``key`` at (lat, lon), moving it if already present"""
+        if key in self.points:
+            self.remove(key)
+        cell = self._cell(lat, lon)
+        self.cells[cell][key] = (lat, lon)
+        self.points[key] = (lat, lon, cell)
+
+    def remove(self, key):
+        lat, lon, cell = self.points.pop(key)
+        bucket = self.cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self.cells[cell]
+
+    @classmethod
+    def from_frame(cls, df, key, lat="Latitude", lon="Longitude", cell_km=2.0):
+        """Index the rows of ``df`` that have coordinates"""
+        index = cls(cell_km)
+        df = df.dropna(subset=[lat, lon])
+        for k, y, x in zip(df[key].tolist(), df[lat].tolist(), df[lon].tolist()):
+            index.add(k, y, x)
+        return index
+
+    def within(self, lat, lon, radius_km):
+        """[(distance km, key)] of the points within ``radius_km``, nearest first"""
+        lat_span = radius_km / KM_PER_DEGREE
+        cos_lat = max(MIN_COS_LAT, min(math.cos(math.radians(min(90.0, abs(lat) + lat_span))), 1.0))
+        lon_span = min(180.0, lat_span / cos_lat)
+        row_lo, col_lo = self._cell(lat - lat_span, lon - lon_span)
+        row_hi, col_hi = self._cell(lat + lat_span, lon + lon_span)
+        found = []
+        cells = self.cells
+        if (row_hi - row_lo + 1) * (col_hi - col_lo + 1) > len(cells):
+            # Search box larger than the populated grid: walk the cells that exist instead
+            candidates = (
+                bucket for (row, col), bucket in cells.items()
+                if row_lo <= row <= row_hi and col_lo <= col <= col_hi
+            )
+        else:
+            candidates = (
+                cells[(row, col)] for row in range(row_lo, row_hi + 1) for col in range(col_lo, col_hi + 1)
+                if (row, col) in cells
+            )
+        for bucket in candidates:
+            for key, (y, x) in bucket.items():
+                distance = haversine_km(lat, lon, y, x)
+                if distance <= radius_km:
+                    found.append((distance, key))
+        found.sort()
+        return found
+
+    def nearest(self, lat, lon, k=1, max_km=None):
+        """The ``k`` nearest [(distance km, key)], optionally no further than ``max_km``"""
+        limit = max_km if max_km is not None else math.pi * EARTH_RADIUS_KM
+        radius = min(self.cell_deg * KM_PER_DEGREE, limit)
+        while True:
+            found = self.within(lat, lon, radius)
+            # Everything within ``radius`` is found, so k hits inside it are the true k nearest
+            if len(found) >= k or radius >= limit or len(found) == len(self.points):
+                return found[:k]
+            radius = min(radius * 2, limit)
+
+
+class NearbyListings:
+    """Open listings found through the location of their provider.
+
+    Listings are grouped per provider once; a query looks up the providers
+    around a point in the grid and returns their listings, soonest expiry
+    first. Both listings and providers can be added or removed as they
+    change.
+    """
+
+    def __init__(self, providers, cell_km=2.0):
+        self.index = providers if isinstance(providers, GridIndex) else GridIndex.from_frame(
+            providers, "Provider_ID", cell_km=cell_km
+        )
+        self.by_provider = defaultdict(dict)
+
+    def add_listing(self, food_id, provider_id, expiry, quantity):
+        self.by_provider[provider_id][food_id] = (expiry, quantity)
+
+    def remove_listing(self, food_id, provider_id):
+        self.by_provider[provider_id].pop(food_id, None)
+
+    def add_listings(self, listings):
+        expiry = as_datetime(listings["Expiry_Date"])
+        for food_id, provider_id, day, quantity in zip(
+            listings["Food_ID"].tolist(), listings["Provider_ID"].tolist(), expiry.tolist(), listings["Quantity"].tolist()
+        ):
+            if quantity > 0:
+                self.add_listing(food_id, provider_id, day, quantity)
+
+    def near(self, lat, lon, radius_km=5.0, today=None):
+        """[(expiry, distance km, food id, provider id, quantity)] within ``radius_km``, soonest expiry first"""
+        today = pd.Timestamp(today) if today is not None else None
+        found = []
+        for distance, provider_id in self.index.within(lat, lon, radius_km):
+            for food_id, (expiry, quantity) in self.by_provider.get(provider_id, {}).items():
+                if today is None or (not pd.isna(expiry) and expiry >= today):
+                    found.append((expiry, distance, food_id, provider_id, quantity))
+        # Undated listings last, then the nearest first among equal expiries
+        found.sort(key=lambda row: (pd.Timestamp.max if pd.isna(row[0]) else row[0], row[1]))
+        return found
+
+
+def from_database(conn, cell_km=2.0):
+    """(provider index, receiver index, nearby listings) for a food_wastage.db connection"""
+    providers = pd.read_sql_query(
+        "SELECT id AS Provider_ID, latitude AS Latitude, longitude AS Longitude FROM providers", conn
+    )
+    receivers = pd.read_sql_query(
+        "SELECT id AS Receiver_ID, latitude AS Latitude, longitude AS Longitude FROM receivers", conn
+    )
+    listings = pd.read_sql_query(
+        "SELECT id AS Food_ID, provider_id AS Provider_ID, expiry_date AS Expiry_Date, quantity AS Quantity "
+        "FROM food_listings WHERE status = 'available'", conn
+    )
+    provider_index = GridIndex.from_frame(providers, "Provider_ID", cell_km=cell_km)
+    nearby = NearbyListings(provider_index)
+    nearby.add_listings(listings)
+    return provider_index, GridIndex.from_frame(receivers, "Receiver_ID", cell_km=cell_km), nearby
+
+
+# =========================
+# Benchmark
+# =========================
+def bench(n_points, radius_km, k=10, queries=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    # Points spread like a large country: about 3000 x 3000 km
+    lats = rng.uniform(8, 35, n_points)
+    lons = rng.uniform(68, 97, n_points)
+
+    start = time.perf_counter()
+    index = GridIndex(cell_km=radius_km)
+    for key, (y, x) in enumerate(zip(lats.tolist(), lons.tolist())):
+        index.add(key, y, x)
+    build_s = time.perf_counter() - start
+
+    query_lats, query_lons = rng.uniform(8, 35, queries), rng.uniform(68, 97, queries)
+    for name, run in [
+        (f"within {radius_km} km", lambda y, x: index.within(y, x, radius_km)),
+        (f"nearest {k}", lambda y, x: index.nearest(y, x, k)),
+    ]:
+        latencies = []
+        for y, x in zip(query_lats.tolist(), query_lons.tolist()):
+            start = time.perf_counter()
+            run(y, x)
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1000
+        print(f"{name:<16} mean {latencies.mean():.3f} ms  p50 {np.percentile(latencies, 50):.3f} ms  "
+              f"p99 {np.percentile(latencies, 99):.3f} ms")
+
+    # Incremental updates: move 10% of the points
+    moved = rng.choice(n_points, n_points // 10, replace=False)
+    start = time.perf_counter()
+    for key in moved.tolist():
+        lats[key], lons[key] = rng.uniform(8, 35), rng.uniform(68, 97)
+        index.add(key, lats[key], lons[key])
+    move_s = time.perf_counter() - start
+    print(f"build {n_points} points {build_s:.2f}s, move {len(moved)} points {move_s:.2f}s "
+          f"({len(moved) / move_s:,.0f}/s)")
+
+    # Same answers as a brute-force scan of every point
+    for y, x in zip(query_lats[:50].tolist(), query_lons[:50].tolist()):
+        distances = haversine_km_array(y, x, lats, lons)
+        expected = set(np.flatnonzero(distances <= radius_km).tolist())
+        assert {key for _, key in index.within(y, x, radius_km)} == expected
+        nearest = [key for _, key in index.nearest(y, x, k)]
+        assert np.allclose(np.sort(distances)[:k], distances[nearest])
+    print("check matches a brute-force scan on 50 queries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--points", type=int, default=300_000)
+    parser.add_argument("--radius", type=float, default=5.0, help="search radius in km")
+    parser.add_argument("--db", help="food_wastage.db to search")
+    parser.add_argument("--receiver", type=int, help="receiver id to search around")
+    parser.add_argument("--today", help="skip listings expiring before this date")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.points, args.radius)
+        return
+    if not (args.db and args.receiver):
+        parser.error("--db and --receiver are required unless --bench is given")
+    with sqlite3.connect(f"file:{args.db}?mode=ro", uri=True) as conn:
+        providers, receivers, nearby = from_database(conn)
+    if args.receiver not in receivers.points:
+        raise SystemExit(f"Receiver {args.receiver} has no coordinates")
+    lat, lon, _ = receivers.points[args.receiver]
+    rows = nearby.near(lat, lon, args.radius, args.today)
+    print(pd.DataFrame(rows, columns=["Expiry_Date", "Distance_km", "Food_ID", "Provider_ID", "Quantity"]).to_string(index=False))
+    print("nearest providers:", ", ".join(f"{key} ({distance:.1f} km)" for distance, key in providers.nearest(lat, lon, 5)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Startup timings for the dashboard.
+
+    python -m food_wastage_app.startup              # import and table-load times, plus recent app starts
+    python -m food_wastage_app.startup --cold       # same, rebuilding the snapshots first
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+from datetime import datetime, timezone
+
+STARTUP_LOG = os.path.join("snapshots", "startup_log.jsonl")
+
+# Third-party modules the app can pull in; plotting ones load only when a chart is drawn
+IMPORTS = ["streamlit", "pandas", "pyarrow", "matplotlib.pyplot", "seaborn", "altair"]
+
+
+class StartupReport:
+    """Phase timings of the first app run in this process (later reruns are ignored)"""
+
+    def __init__(self, log_path=STARTUP_LOG):
+        self.log_path = log_path
+        self.phases = {}
+        self.finished = False
+        self.lock = threading.Lock()
+
+    def record(self, phase, seconds):
+        with self.lock:
+            if not self.finished:
+                self.phases.setdefault(phase, seconds)
+
+    def finish(self):
+        """Close the report and append it to the startup log"""
+        with self.lock:
+            if self.finished:
+                return
+            self.finished = True
+        if self.log_path:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path, "a") as f:
+                record = {"started": datetime.now(timezone.utc).isoformat(timespec="seconds"), **self.phases}
+                f.write(json.dumps(record) + "\n")
+
+    def rows(self, table_load_times=None):
+        """(phase, seconds) rows, followed by the per-table loads seen so far"""
+        rows = list(self.phases.items())
+        rows += [(f"load {name}", seconds) for name, seconds in (table_load_times or {}).items()]
+        return rows
+
+
+def import_time(module):
+    """Cumulative seconds to import ``module`` in a fresh interpreter (python -X importtime)"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True)
+    if proc.returncode:
+        return None  # not installed
+    for line in reversed(proc.stderr.splitlines()):
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1e6
+    return None
+
+
+def table_load_times(cold=False):
+    from food_wastage_app.snapshots import SNAPSHOT_DIR, snapshot_path
+    from food_wastage_app.store import DataStore
+
+    store = DataStore()
+    if cold:
+        for path in store.files.values():
+            snapshot = snapshot_path(path, SNAPSHOT_DIR)
+            if os.path.exists(snapshot):
+                os.remove(snapshot)
+    for name in store.files:
+        store.table(name)
+    return dict(store.load_times)
+
+
+def recent_starts(log_path=STARTUP_LOG, limit=10):
+    if not os.path.exists(log_path):
+        return []
+    with open(log_path) as f:
+        return [json.loads(line) for line in f.readlines()[-limit:]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cold", action="store_true")
+    args = parser.parse_args()
+
+    for module in IMPORTS:
+        seconds = import_time(module)
+        print(f"import {module:<20} {seconds * 1000:8.1f} ms" if seconds is not None else f"import {module:<20} unavailable")
+    for name, seconds in table_load_times(args.cold).items():
+        print(f"load   {name:<20} {seconds * 1000:8.1f} ms")
+    for record in recent_starts():
+        print("app start " + ", ".join(
+            f"{key} {value:.2f}s" if isinstance(value, float) else f"{key} {value}" for key, value in record.items()
+        ))
+
+
+if __name__ == "__main__":
+    main()
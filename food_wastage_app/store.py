@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from food_wastage_app.facts import DATA_FILES, TABLE_COLUMNS, TABLE_FILES, LazyDataset, data_version
+from food_wastage_app.partitions import PARTITION_COLUMNS
+from food_wastage_app.snapshots import apply_filters, read_table
+
+# One consistent generation of the data: every reader holds on to the state it
+# started with, so a reload never mixes old and new tables
+State = namedtuple("State", ["version", "tables", "full", "filtered"])
+
+
+class DataStore:
+    """Process-wide, read-only copy of the tables and facts shared by every session.
+
+    Tables are read from the Parquet snapshots into ordinary (numpy and
+    categorical) DataFrames once per generation, and every caller gets those
+    same objects back: sessions share one copy in process memory instead of
+    each holding its own. Callers must not modify them in place (the views
+    copy before adding columns). Each table
+    is read the first time a view needs it, and only the columns asked for;
+    a later request for more columns re-reads it once with the union. With a
+    PartitionStore, a date-filtered read of a table not loaded yet opens only
+    the month partitions the range touches. When a watched file changes,
+    the next call starts a new generation and swaps it in with a single
+    assignment; callers still holding the old one keep a consistent view
+    until they are done with it.
+    """
+
+    def __init__(self, files=TABLE_FILES, watch=DATA_FILES, max_filtered=16, partitions=None):
+        self.files = dict(files)
+        self.watch = list(watch)
+        self.max_filtered = max_filtered
+        self.partitions = partitions
+        self.state = None
+        self.reloads = 0
+        self.load_times = {}
+        self.lock = threading.Lock()
+
+    def current(self):
+        """The live generation, starting a new one first if a watched file changed"""
+        version = data_version(self.watch)
+        state = self.state
+        if state is not None and state.version == version:
+            return state
+        with self.lock:
+            # Another session may have reloaded while we waited
+            if self.state is None or self.state.version != version:
+                self.state = State(version, {}, set(), OrderedDict())
+                self.reloads += 1
+            return self.state
+
+    def version(self):
+        return self.current().version
+
+    def _has(self, state, name, columns):
+        df = state.tables.get(name)
+        if df is None:
+            return False
+        return name in state.full if columns is None else set(columns) <= set(df.columns)
+
+    def _table(self, state, name, columns=None):
+        if not self._has(state, name, columns):
+            with self.lock:
+                if not self._has(state, name, columns):
+                    loaded = state.tables.get(name)
+                    wanted = None
+                    if columns is not None:
+                        wanted = set(columns) | set(loaded.columns if loaded is not None else ())
+                        wanted = [col for col in TABLE_COLUMNS.get(name, sorted(wanted)) if col in wanted]
+                    start = time.perf_counter()
+                    state.tables[name] = read_table(self.files[name], columns=wanted)
+                    self.load_times[name] = time.perf_counter() - start
+                    if wanted is None:
+                        state.full.add(name)
+        df = state.tables[name]
+        return df if columns is None else df[list(columns)]
+
+    def _filtered(self, state, name, columns=None, pushdown=None):
+        """``name`` narrowed to the ``pushdown`` filters"""
+        if (pushdown and self.partitions is not None and name in PARTITION_COLUMNS
+                and not self._has(state, name, columns) and self.partitions.prunes(name, pushdown)):
+            # The shared table is not in memory: read only the months in range rather than all of it
+            df = self.partitions.read(name, columns=columns, filters=pushdown)
+            return df if columns is None else df[list(columns)]
+        df = self._table(state, name, columns)
+        return apply_filters(df, pushdown) if pushdown else df
+
+    def table(self, name, columns=None):
+        return self._table(self.current(), name, columns)
+
+    def preload(self, columns):
+        """Read every table in ``columns`` ({table: columns}) once, e.g. the union a batch of views needs"""
+        state = self.current()
+        for name, cols in columns.items():
+            self._table(state, name, cols)
+
+    def dataset(self, filters=None, columns=None):
+        """The shared (lazily loaded) Dataset, narrowed to ``filters`` and
+        ``columns``; the most recent combinations are kept per generation"""
+        state = self.current()
+        key = (filters, tuple(sorted((name, tuple(cols)) for name, cols in (columns or {}).items())))
+        with self.lock:
+            data = state.filtered.get(key)
+            if data is None:
+                data = LazyDataset(lambda name, cols, pushdown: self._filtered(state, name, cols, pushdown), filters, columns)
+                state.filtered[key] = data
+                while len(state.filtered) > self.max_filtered:
+                    state.filtered.popitem(last=False)
+            state.filtered.move_to_end(key)
+        return data
@@ -0,0 +1,332 @@
+"""Materialized KPI summaries kept in a local SQLite file.
+
+    python -m food_wastage_app.summaries              # refresh what is stale
+    python -m food_wastage_app.summaries --full       # rebuild from scratch
+    python -m food_wastage_app.summaries --watch 300  # keep refreshing every 5 minutes
+    python -m food_wastage_app.summaries --status     # show staleness
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from food_wastage_app.facts import PROVIDER_COLUMNS, TABLE_FILES, build_claim_facts, data_version
+from food_wastage_app.rollups import CsvTail
+from food_wastage_app.schema import as_datetime
+from food_wastage_app.snapshots import SNAPSHOT_DIR, apply_types, read_table
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_DB = os.path.join(SNAPSHOT_DIR, "summaries.db")
+
+# name -> keys, measures, source tables, and the append-only table that can be tailed.
+# City/Type are the provider's on listings and the receiver's on claims (as in facts.py);
+# Month is the expiry month for listings and the claim month for claims.
+SUMMARIES = {
+    "listing_summary": {
+        "keys": ["City", "Type", "Food_Type", "Month"],
+        "measures": ["Listings", "Quantity"],
+        "sources": ["providers", "listings"],
+        "tail": "listings",
+    },
+    "claim_summary": {
+        "keys": ["City", "Type", "Provider_Type", "Food_Type", "Month"],
+        "measures": ["Claims"],
+        "sources": ["receivers", "listings", "claims"],
+        "tail": "claims",
+    },
+}
+
+META_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summary_meta (
+    name TEXT PRIMARY KEY,
+    mode TEXT,
+    refreshed_at TEXT,
+    source_version TEXT,
+    tail_offset INTEGER,
+    tail_header TEXT,
+    rows INTEGER,
+    tail_fingerprint TEXT
+)
+"""
+
+
+def _month(series):
+    return as_datetime(series).dt.strftime("%Y-%m")
+
+
+def summarise(name, tables):
+    """Aggregate fact rows built from ``tables`` into summary cells"""
+    if name == "listing_summary":
+        facts = tables["listings"].merge(tables["providers"][PROVIDER_COLUMNS], on="Provider_ID", how="left")
+        facts = facts.assign(Month=_month(facts["Expiry_Date"]))
+        measures = {"Listings": ("Food_ID", "count"), "Quantity": ("Quantity", "sum")}
+    else:
+        facts = build_claim_facts(tables["claims"], tables["receivers"], tables["listings"])
+        facts = facts.assign(Month=_month(facts["Timestamp"]))
+        measures = {"Claims": ("Claim_ID", "count")}
+    keys = SUMMARIES[name]["keys"]
+    facts = facts[keys + sorted({col for col, _ in measures.values()})]
+    facts = facts.astype({key: object for key in keys})
+    return facts.groupby(keys, dropna=False).agg(**measures).reset_index()
+
+
+class SummaryStore:
+    """Summary tables plus the metadata needed to decide how to refresh them.
+
+    A full refresh rebuilds a table from the source CSVs. An incremental
+    refresh only reads rows appended to the table's append-only source and
+    adds them to their cells; it is used while every other source is
+    unchanged and falls back to a full rebuild otherwise.
+    """
+
+    def __init__(self, path=SUMMARY_DB, files=TABLE_FILES):
+        self.path = path
+        self.files = dict(files)
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self.connect() as conn:
+            conn.execute(META_SCHEMA)
+            if "tail_fingerprint" not in {row[1] for row in conn.execute("PRAGMA table_info(summary_meta)")}:
+                # Written before tails were fingerprinted: the next refresh of each summary is a full one
+                conn.execute("ALTER TABLE summary_meta ADD COLUMN tail_fingerprint TEXT")
+            for name, spec in SUMMARIES.items():
+                keys = ", ".join(f'"{key}"' for key in spec["keys"])
+                columns = [f'"{key}" TEXT' for key in spec["keys"]] + [f'"{m}" REAL' for m in spec["measures"]]
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {name} ({', '.join(columns)})")
+                conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {name}_keys ON {name} ({keys})")
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _dimension_version(self, name):
+        """Fingerprint of the sources that are not tailed; any change forces a full rebuild"""
+        spec = SUMMARIES[name]
+        return json.dumps(data_version([self.files[t] for t in spec["sources"] if t != spec["tail"]]))
+
+    def meta(self, name):
+        with self.connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM summary_meta WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    def _write(self, conn, name, cells, replace):
+        spec = SUMMARIES[name]
+        columns = spec["keys"] + spec["measures"]
+        quoted = ", ".join(f'"{col}"' for col in columns)
+        updates = ", ".join(f'"{m}" = "{m}" + excluded."{m}"' for m in spec["measures"])
+        rows = cells[columns].astype(object).where(cells[columns].notna(), None).itertuples(index=False, name=None)
+        if replace:
+            conn.execute(f"DELETE FROM {name}")
+        conn.executemany(
+            f"INSERT INTO {name} ({quoted}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT DO UPDATE SET {updates}",
+            rows,
+        )
+
+    def _record(self, conn, name, mode, tail):
+        count = conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+        conn.execute(
+            "INSERT OR REPLACE INTO summary_meta VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (name, mode, datetime.now(timezone.utc).isoformat(timespec="seconds"), self._dimension_version(name),
+             tail.offset, json.dumps(tail.header), count, json.dumps({"digest": tail.digest, "stat": tail.stat})),
+        )
+
+    def _tail(self, name, meta):
+        """The tail of ``name``'s appended source where the last refresh left it, or None if unknown"""
+        if meta is None or not meta["tail_fingerprint"]:
+            return None
+        tail = CsvTail(self.files[SUMMARIES[name]["tail"]])
+        fingerprint = json.loads(meta["tail_fingerprint"])
+        tail.offset, tail.header = meta["tail_offset"], json.loads(meta["tail_header"])
+        tail.digest, tail.stat = fingerprint["digest"], fingerprint["stat"]
+        return tail
+
+    def refresh_full(self, name):
+        spec = SUMMARIES[name]
+        tables = {t: read_table(self.files[t]) for t in spec["sources"]}
+        tail = CsvTail(self.files[spec["tail"]])
+        # Everything up to the current end of the tailed file is now summarised
+        tail.skip_to_end()
+        with self.connect() as conn:
+            self._write(conn, name, summarise(name, tables), replace=True)
+            self._record(conn, name, "full", tail)
+        return "full"
+
+    def refresh_incremental(self, name):
+        """Add appended rows; returns None when only a full rebuild is correct"""
+        spec = SUMMARIES[name]
+        meta = self.meta(name)
+        tail = self._tail(name, meta)
+        if tail is None or meta["source_version"] != self._dimension_version(name):
+            return None
+        # None when the file was rewritten rather than appended to
+        new = tail.read_new()
+        if new is None:
+            return None
+        tables = {t: read_table(self.files[t]) for t in spec["sources"] if t != spec["tail"]}
+        tables[spec["tail"]] = apply_types(new)
+        with self.connect() as conn:
+            if not new.empty:
+                self._write(conn, name, summarise(name, tables), replace=False)
+            self._record(conn, name, "incremental", tail)
+        return "incremental"
+
+    def is_stale(self, name):
+        meta = self.meta(name)
+        tail = self._tail(name, meta)
+        return tail is None or meta["source_version"] != self._dimension_version(name) or tail.changed()
+
+    def refresh(self, mode="auto"):
+        """Refresh every summary; ``auto`` skips fresh ones and prefers incremental"""
+        done = {}
+        with self.lock:
+            for name in SUMMARIES:
+                if mode == "auto" and not self.is_stale(name):
+                    continue
+                if mode != "full":
+                    try:
+                        done[name] = self.refresh_incremental(name)
+                    except Exception:  # e.g. rows that do not parse: rebuild rather than keep failing
+                        logger.warning("Incremental refresh of %s failed, rebuilding", name, exc_info=True)
+                if done.get(name) is None:
+                    done[name] = self.refresh_full(name)
+        return done
+
+    def staleness(self):
+        """{name: {mode, refreshed_at, age_seconds, rows, stale}}"""
+        status = {}
+        now = datetime.now(timezone.utc)
+        for name in SUMMARIES:
+            meta = self.meta(name) or {}
+            refreshed = meta.get("refreshed_at")
+            status[name] = {
+                "mode": meta.get("mode"),
+                "refreshed_at": refreshed,
+                "age_seconds": (now - datetime.fromisoformat(refreshed)).total_seconds() if refreshed else None,
+                "rows": meta.get("rows"),
+                "stale": self.is_stale(name),
+            }
+        return status
+
+    # =========================
+    # Views over the summaries
+    # =========================
+    def supports(self, filters):
+        """True when the filters can be answered from the summary keys alone"""
+        return filters is None or filters.month_aligned()
+
+    def _where(self, filters, provider_type_col):
+        clauses, params = [], []
+        if filters is None:
+            return "", params
+        for col, values in [("City", filters.cities), (provider_type_col, filters.provider_types),
+                            ("Food_Type", filters.food_types)]:
+            if values:
+                clauses.append(f'"{col}" IN ({", ".join("?" * len(values))})')
+                params.extend(values)
+        first, last = filters.month_range()
+        if first:
+            clauses.append('"Month" >= ?')
+            params.append(first)
+        if last:
+            clauses.append('"Month" <= ?')
+            params.append(last)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, name, select, group_by, filters=None):
+        """Aggregate a summary table; cells with a missing group key are left out, as in pandas"""
+        where, params = self._where(filters, "Type" if name == "listing_summary" else "Provider_Type")
+        having = " AND ".join(f'"{col}" IS NOT NULL' for col in group_by)
+        sql = f"SELECT {select} FROM {name}{where} GROUP BY {', '.join(group_by)} HAVING {having}"
+        with self.connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def quantity_by_provider_type(self, filters=None):
+        result = self.query("listing_summary", 'Type, CAST(SUM(Quantity) AS INTEGER) AS Quantity', ["Type"], filters)
+        return result.sort_values("Quantity", ascending=False)
+
+    def avg_quantity_by_provider_type(self, filters=None):
+        result = self.query("listing_summary", "Type, SUM(Quantity) / SUM(Listings) AS Quantity", ["Type"], filters)
+        return result.sort_values("Quantity", ascending=False)
+
+    def contribution_by_provider_type(self, filters=None):
+        return self.query("listing_summary", "Type, CAST(SUM(Quantity) AS INTEGER) AS Quantity", ["Type"], filters)
+
+    def claim_share_by_receiver_type(self, filters=None):
+        return self.query("claim_summary", "Type, CAST(SUM(Claims) AS INTEGER) AS Claims", ["Type"], filters)
+
+    def availability_heatmap(self, filters=None):
+        cells = self.query(
+            "listing_summary", "Food_Type, City, SUM(Quantity) AS Quantity", ["Food_Type", "City"], filters
+        )
+        return cells.pivot_table(
+            index="Food_Type", columns="City", values="Quantity", aggfunc="sum", fill_value=0
+        ).astype("int64")
+
+
+class RefreshScheduler:
+    """Background thread refreshing a SummaryStore: incremental every ``interval``
+    seconds, full every ``full_interval`` seconds"""
+
+    def __init__(self, store, interval=300, full_interval=24 * 3600):
+        self.store = store
+        self.interval = interval
+        self.full_interval = full_interval
+        self.last_full = time.monotonic()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="summary-refresh", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def tick(self):
+        if time.monotonic() - self.last_full >= self.full_interval:
+            self.last_full = time.monotonic()
+            return self.store.refresh("full")
+        return self.store.refresh("auto")
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.tick()
+            except Exception:  # keep the schedule alive; the next tick retries
+                logger.warning("Scheduled summary refresh failed", exc_info=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=SUMMARY_DB)
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument("--watch", type=float, metavar="SECONDS")
+    parser.add_argument("--status", action="store_true")
+    args = parser.parse_args()
+
+    store = SummaryStore(args.db)
+    if not args.status:
+        print(store.refresh("full" if args.full else "auto") or "up to date")
+    if args.watch:
+        scheduler = RefreshScheduler(store, interval=args.watch).start()
+        try:
+            while True:
+                time.sleep(args.watch)
+                print(store.staleness())
+        except KeyboardInterrupt:
+            scheduler.stop()
+        return
+    for name, status in store.staleness().items():
+        print(name, status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Row counts of the shipped CSVs; scale 1 reproduces them
+BASE_ROWS = {"providers": 1000, "receivers": 1000, "listings": 1000, "claims": 1000}
+
+PROVIDER_TYPES = ["Catering Service", "Grocery Store", "Restaurant", "Supermarket"]
+RECEIVER_TYPES = ["Charity", "Individual", "NGO", "Shelter"]
+FOOD_NAMES = ["Bread", "Chicken", "Dairy", "Fish", "Fruits", "Pasta", "Rice", "Salad", "Soup", "Vegetables"]
+FOOD_TYPES = ["Non-Vegetarian", "Vegan", "Vegetarian"]
+MEAL_TYPES = ["Breakfast", "Dinner", "Lunch", "Snacks"]
+STATUSES = ["Cancelled", "Completed", "Pending"]
+
+START_DATE = pd.Timestamp("2025-01-01")
+DAYS_SPAN = 365
+
+
+def _labels(prefix, ids):
+    return prefix + " " + pd.Series(ids).astype(str)
+
+
+def _contacts(rng, n):
+    return "+1-" + pd.Series(rng.integers(0, 10**10, n)).astype(str).str.zfill(10)
+
+
+def _us_date(ts):
+    """m/d/Y without zero padding, as in the shipped CSVs"""
+    return ts.month.astype(str) + "/" + ts.day.astype(str) + "/" + ts.year.astype(str)
+
+
+def generate(scale=1, seed=0):
+    """Generate the four tables with the shipped CSV schema at ``scale`` x the row counts"""
+    rng = np.random.default_rng(seed)
+    n = {name: rows * scale for name, rows in BASE_ROWS.items()}
+    # City pool grows with the data, like the shipped files (almost one city per provider)
+    cities = _labels("City", np.arange(max(n["providers"] * 9 // 10, 1)))
+
+    provider_ids = np.arange(1, n["providers"] + 1)
+    providers = pd.DataFrame({
+        "Provider_ID": provider_ids,
+        "Name": _labels("Provider", provider_ids),
+        "Type": rng.choice(PROVIDER_TYPES, n["providers"]),
+        "Address": _labels("Street", provider_ids),
+        "City": cities.to_numpy()[rng.integers(0, len(cities), n["providers"])],
+        "Contact": _contacts(rng, n["providers"]),
+    })
+
+    receiver_ids = np.arange(1, n["receivers"] + 1)
+    receivers = pd.DataFrame({
+        "Receiver_ID": receiver_ids,
+        "Name": _labels("Receiver", receiver_ids),
+        "Type": rng.choice(RECEIVER_TYPES, n["receivers"]),
+        "City": cities.to_numpy()[rng.integers(0, len(cities), n["receivers"])],
+        "Contact": _contacts(rng, n["receivers"]),
+    })
+
+    listing_provider = rng.integers(1, n["providers"] + 1, n["listings"])
+    expiry = START_DATE + pd.to_timedelta(rng.integers(0, DAYS_SPAN, n["listings"]), unit="D")
+    listings = pd.DataFrame({
+        "Food_ID": np.arange(1, n["listings"] + 1),
+        "Food_Name": rng.choice(FOOD_NAMES, n["listings"]),
+        "Quantity": rng.integers(1, 51, n["listings"]),
+        "Expiry_Date": _us_date(expiry),
+        "Provider_ID": listing_provider,
+        "Provider_Type": providers["Type"].to_numpy()[listing_provider - 1],
+        "Location": providers["City"].to_numpy()[listing_provider - 1],
+        "Food_Type": rng.choice(FOOD_TYPES, n["listings"]),
+        "Meal_Type": rng.choice(MEAL_TYPES, n["listings"]),
+    })
+
+    minutes = rng.integers(0, DAYS_SPAN * 24 * 60, n["claims"])
+    timestamps = START_DATE + pd.to_timedelta(minutes, unit="min")
+    claims = pd.DataFrame({
+        "Claim_ID": np.arange(1, n["claims"] + 1),
+        # Roughly two thirds of listings get claimed, as in the shipped data
+        "Food_ID": rng.integers(1, n["listings"] * 2 // 3 + 1, n["claims"]),
+        "Receiver_ID": rng.integers(1, n["receivers"] + 1, n["claims"]),
+        "Status": rng.choice(STATUSES, n["claims"]),
+        "Timestamp": _us_date(timestamps) + " " + timestamps.hour.astype(str) + timestamps.strftime(":%M"),
+    })
+    return {"providers": providers, "receivers": receivers, "listings": listings, "claims": claims}
+
+
+def write_csvs(out_dir, scale=1, seed=0):
+    """Write providers/receivers/listings/claims CSVs into ``out_dir`` and return their paths"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    for name, df in generate(scale, seed).items():
+        paths[name] = os.path.join(out_dir, f"{name}.csv")
+        df.to_csv(paths[name], index=False)
+    return paths
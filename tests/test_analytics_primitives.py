@@ -0,0 +1,88 @@
+"""The vectorized analytics views against the per-group lambdas they replaced, on the shipped CSVs"""
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from food_wastage_app import analytics
+from food_wastage_app.facts import TABLE_FILES, build_dataset, narrow_dataset
+from food_wastage_app.filters import FilterPredicate
+from food_wastage_app.snapshots import read_table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# =====================================================
+# Reference implementations (before the primitives)
+# =====================================================
+def success_rate_by_city(data):
+    df = data.claim_facts
+    result = (
+        df.groupby("City", observed=True)["Status"]
+        .apply(lambda s: (s == "Completed").mean())
+        .reset_index(name="Success_Rate")
+        .sort_values("Success_Rate", ascending=False)
+    )
+    result["Success_Rate"] = (result["Success_Rate"] * 100).round(2)
+    return result
+
+
+def unclaimed_rate_by_provider_type(data):
+    agg = data.listing_facts.groupby("Type", observed=True).agg(
+        total_listings=("Food_ID", "count"),
+        unclaimed=("ClaimCount", lambda x: (x == 0).sum()),
+    )
+    agg["Unclaimed_Rate"] = (agg["unclaimed"] / agg["total_listings"] * 100).round(2)
+    return agg.reset_index().sort_values("Unclaimed_Rate", ascending=True)
+
+
+def unclaimed_trend(data):
+    df = data.listing_facts.copy()
+    df["Expiry_Date"] = pd.to_datetime(df["Expiry_Date"], errors="coerce")
+    df["Month"] = df["Expiry_Date"].dt.to_period("M").astype(str)
+    monthly = df.groupby("Month").agg(
+        listings=("Food_ID", "count"),
+        unclaimed=("ClaimCount", lambda x: (x == 0).sum()),
+    ).reset_index()
+    monthly["Unclaimed_Rate_%"] = (monthly["unclaimed"] / monthly["listings"] * 100).round(2)
+    return monthly[["Month", "listings", "unclaimed", "Unclaimed_Rate_%"]]
+
+
+def unclaimed_by_city(data):
+    df = data.listing_facts.copy()
+    df["Unclaimed_Item"] = (df["ClaimCount"] == 0).astype(int)
+    result = df.groupby("City", observed=True)["Unclaimed_Item"].sum().reset_index()
+    return result.rename(columns={"Unclaimed_Item": "Unclaimed Listings"}).sort_values(
+        "Unclaimed Listings", ascending=False
+    )
+
+
+REFERENCES = [success_rate_by_city, unclaimed_rate_by_provider_type, unclaimed_trend, unclaimed_by_city]
+
+
+# =====================================================
+# Tests
+# =====================================================
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    snapshot_dir = str(tmp_path_factory.mktemp("snapshots"))
+    tables = {name: read_table(os.path.join(ROOT, path), snapshot_dir=snapshot_dir) for name, path in TABLE_FILES.items()}
+    return build_dataset(tables["providers"], tables["receivers"], tables["listings"], tables["claims"])
+
+
+def filtered(data):
+    filters = FilterPredicate.from_sidebar(
+        start_date=date(2025, 3, 5), end_date=date(2025, 3, 20), food_types=["Vegetarian"]
+    )
+    return narrow_dataset(data, filters)
+
+
+@pytest.mark.parametrize("narrow", [False, True], ids=["all", "filtered"])
+@pytest.mark.parametrize("reference", REFERENCES, ids=lambda f: f.__name__)
+def test_matches_reference(dataset, reference, narrow):
+    data = filtered(dataset) if narrow else dataset
+    assert len(data.listing_facts) and len(data.claim_facts)
+    expected = reference(data)
+    result = getattr(analytics, reference.__name__)(data)
+    pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,49 @@
+"""The near-expiry view leaves out what has already expired, on a fixed clock"""
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from food_wastage_app import analytics
+from food_wastage_app.expiry import ExpiryIndex
+from food_wastage_app.facts import Dataset
+from food_wastage_app.filters import FilterPredicate
+
+NOW = pd.Timestamp("2025-03-20 12:00")
+
+LISTING_FACTS = pd.DataFrame({
+    "Food_ID": [1, 2, 3, 4, 5],
+    "Food_Name": ["Rice", "Bread", "Soup", "Fish", "Milk"],
+    "City": ["A", "A", "B", "B", "A"],
+    "Food_Type": ["Vegetarian"] * 5,
+    "Quantity": [10, 20, 30, 40, 50],
+    # 1 expired yesterday; 2 is good until midnight tonight; 4 is claimed
+    "Expiry_Date": pd.to_datetime(["2025-03-19", "2025-03-20", "2025-03-22", "2025-03-21", "2025-03-25"]),
+    "ClaimCount": [0, 0, 0, 1, 0],
+})
+
+
+def expiring_soon(source, filters=None):
+    if source == "index":
+        return ExpiryIndex.from_listing_facts(LISTING_FACTS).expiring_soon(filters, now=NOW)
+    data = Dataset(None, None, None, None, LISTING_FACTS, None)
+    return analytics.expiring_soon(data if filters is None else data._replace(
+        listing_facts=filters.apply_listings(LISTING_FACTS)
+    ), now=NOW)
+
+
+@pytest.mark.parametrize("source", ["index", "analytics"])
+def test_skips_expired_listings(source):
+    assert expiring_soon(source)["Food_ID"].tolist() == [2, 3, 5]
+
+
+@pytest.mark.parametrize("source", ["index", "analytics"])
+def test_range_starting_before_now(source):
+    filters = FilterPredicate.from_sidebar(start_date=date(2025, 3, 1), end_date=date(2025, 3, 22))
+    assert expiring_soon(source, filters)["Food_ID"].tolist() == [2, 3]
+
+
+def test_range_entirely_past():
+    filters = FilterPredicate.from_sidebar(start_date=date(2025, 3, 1), end_date=date(2025, 3, 19))
+    assert expiring_soon("index", filters).empty
+    assert expiring_soon("analytics", filters).empty
@@ -0,0 +1,48 @@
+"""An export that fails part way must not change food_wastage.db"""
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from food_wastage_app.loader import load
+from food_wastage_app.migrations import migrate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_FILES = {
+    name: os.path.join(ROOT, f"{file}.csv")
+    for name, file in [("providers", "providers"), ("receivers", "receivers"), ("listings", "listings"), ("claims", "claims")]
+}
+
+
+@pytest.fixture
+def database(tmp_path):
+    """An empty copy of food_wastage.db's schema, loaded with the shipped CSVs"""
+    path = str(tmp_path / "app.db")
+    source, conn = sqlite3.connect(f"file:{os.path.join(ROOT, 'food_wastage.db')}?mode=ro", uri=True), sqlite3.connect(path)
+    for (sql,) in source.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"):
+        conn.execute(sql)
+    source.close()
+    migrate(conn)
+    conn.close()
+    load(SOURCE_FILES, path)
+    return path
+
+
+def claim_ids(path):
+    with sqlite3.connect(path) as conn:
+        return [row[0] for row in conn.execute("SELECT id FROM claims ORDER BY id")]
+
+
+def test_bad_export_leaves_table_unchanged(database, tmp_path):
+    before = claim_ids(database)
+    # A bigger export whose last chunk does not parse: the chunks before it are already staged
+    claims = pd.read_csv(SOURCE_FILES["claims"])
+    more = pd.concat([claims.assign(Claim_ID=claims["Claim_ID"] + len(claims) * i) for i in range(5)])
+    lines = more.to_csv(index=False).splitlines(keepends=True)
+    bad = tmp_path / "claims.csv"
+    bad.write_text("".join(lines[:4500] + ['1,2,"unterminated\n'] + lines[4500:]))
+
+    with pytest.raises(pd.errors.ParserError):
+        load({"claims": str(bad)}, database, delete_missing=True, memory_limit_mb=1)
+    assert claim_ids(database) == before